@@ -1,7 +1,17 @@
 import os
 from scraper_agent import ScraperAgent
+from result_store import ResultStore, content_hash
+from html_document import parse_html, page_metadata
+from url_utils import normalize_url
+from circuit_breaker import STATE_VALUES
 import logging
 import re
+import threading
+import time
+import zlib
+from collections import deque, OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, wait, FIRST_COMPLETED
+from urllib.parse import urlparse
 
 logging.basicConfig(
     level=logging.INFO,
@@ -12,10 +22,22 @@ logger = logging.getLogger(__name__)
 
 class AgentManager:
     
-    def __init__(self, hf_api_key=None):
+    def __init__(self, hf_api_key=None, result_ttl=900, max_recent_results=256, use_result_store=True,
+                 result_store=None, result_store_path=None, result_freshness=86400, **agent_options):
         try:
             self.hf_api_key = hf_api_key or os.environ.get("HF_API_KEY")
-            self.scraper_agent = ScraperAgent(hf_api_key=self.hf_api_key)
+            self.result_ttl = result_ttl
+            self.max_recent_results = max_recent_results
+            self.recent_results = OrderedDict()
+            self.results_lock = threading.Lock()
+            self.in_flight = {}
+            self.in_flight_lock = threading.Lock()
+            self.result_freshness = result_freshness
+            self.result_store = None
+            if use_result_store:
+                self.result_store = result_store or ResultStore(
+                    db_path=result_store_path or os.environ.get("RESULT_STORE_DB"))
+            self.scraper_agent = ScraperAgent(hf_api_key=self.hf_api_key, **agent_options)
             logger.info("Agent manager initialized successfully")
         except Exception as e:
             logger.error(f"Failed to initialize agent manager: {str(e)}")
@@ -39,20 +61,286 @@ class AgentManager:
             if not is_valid:
                 return {"success": False, "error": url_or_error}
 
-            logger.info(f"Processing URL: {url}")
-            result = self.scraper_agent.process_url(url)
+            cached = self.cached_result(url)
+            if cached is not None:
+                return cached
 
-            if result["success"]:
-                logger.info(f"Successfully processed URL: {url}")
-            else:
-                logger.error(f"Failed to process URL: {url}, Error: {result.get('error', 'Unknown error')}")
+            flight, leader = self.join_flight(url)
+            if not leader:
+                logger.info(f"Waiting for in-flight analysis of URL: {url}")
+                return dict(flight.result())
 
+            result = None
+            try:
+                result = self.analyze_website(url)
+            except Exception as e:
+                logger.error(f"Error in process_website: {str(e)}")
+                result = {"success": False, "error": f"Processing failed: {str(e)}"}
+            finally:
+                self.finish_flight(url, flight, result)
             return result
 
         except Exception as e:
             logger.error(f"Error in process_website: {str(e)}")
             return {"success": False, "error": f"Processing failed: {str(e)}"}
 
+    def analyze_website(self, url):
+        scrape_result, unchanged = self.prefetch(url)
+        if unchanged is not None:
+            return unchanged
+
+        logger.info(f"Processing URL: {url}")
+        result = self.scraper_agent.process_url(url, scrape_result)
+
+        if result["success"]:
+            self.store_result(url, result, scrape_result)
+            logger.info(f"Successfully processed URL: {url}")
+        else:
+            logger.error(f"Failed to process URL: {url}, Error: {result.get('error', 'Unknown error')}")
+
+        return result
+
+    def stream_website(self, url):
+        is_valid, url_or_error = self.validate_url(url)
+        if not is_valid:
+            yield {"event": "result", "result": {"success": False, "error": url_or_error}}
+            return
+
+        flight = leader = result = None
+        try:
+            cached = self.cached_result(url)
+            if cached is not None:
+                yield from self.result_events(cached)
+                return
+
+            flight, leader = self.join_flight(url)
+            if not leader:
+                logger.info(f"Waiting for in-flight analysis of URL: {url}")
+                joined = dict(flight.result())
+                if joined["success"]:
+                    yield from self.result_events(joined)
+                else:
+                    yield {"event": "result", "result": joined}
+                return
+
+            scrape_result, unchanged = self.prefetch(url)
+            if unchanged is not None:
+                result = unchanged
+                yield from self.result_events(unchanged)
+                return
+
+            logger.info(f"Streaming URL: {url}")
+            for event in self.scraper_agent.iter_process_url(url, scrape_result):
+                if event["event"] == "result":
+                    result = event["result"]
+                    if result["success"]:
+                        self.store_result(url, result, scrape_result)
+                        logger.info(f"Successfully processed URL: {url}")
+                    else:
+                        logger.error(f"Failed to process URL: {url}, Error: {result.get('error', 'Unknown error')}")
+                yield event
+        except Exception as e:
+            logger.error(f"Error in stream_website: {str(e)}")
+            yield {"event": "result", "result": {"success": False, "error": f"Processing failed: {str(e)}"}}
+        finally:
+            if leader:
+                self.finish_flight(url, flight, result)
+
+    def join_flight(self, url):
+        key = normalize_url(url)
+        with self.in_flight_lock:
+            flight = self.in_flight.get(key)
+            if flight is not None:
+                self.scraper_agent.metrics.inc("single_flight_joins_total")
+                return flight, False
+            flight = self.in_flight[key] = Future()
+            return flight, True
+
+    def finish_flight(self, url, flight, result):
+        with self.in_flight_lock:
+            self.in_flight.pop(normalize_url(url), None)
+        if result is None:
+            result = {"success": False, "error": "Processing failed: analysis did not complete"}
+        flight.set_result(result)
+
+    def crawl_website(self, seed_url, **crawl_options):
+        is_valid, url_or_error = self.validate_url(seed_url)
+        if not is_valid:
+            yield {"url": seed_url, "depth": 0, "status": "failed",
+                   "result": {"success": False, "error": url_or_error}}
+            return
+
+        logger.info(f"Crawling site from: {seed_url}")
+        analyzed = duplicates = 0
+        for page in self.scraper_agent.crawl_site(seed_url, **crawl_options):
+            if page["status"] == "analyzed":
+                analyzed += 1
+                self.store_result(page["url"], page["result"])
+            elif page["status"] == "duplicate":
+                duplicates += 1
+            yield page
+        logger.info(f"Crawl from {seed_url} finished: {analyzed} analyzed, {duplicates} near-duplicates skipped")
+
+    def cached_result(self, url):
+        recent = self.recent_result(url)
+        if recent is not None:
+            logger.info(f"Serving recent result for URL: {url}")
+            return recent
+
+        if self.result_store is None:
+            return None
+        stored = self.result_store.get(normalize_url(url), max_age=self.result_freshness)
+        if stored is None:
+            return None
+        logger.info(f"Serving stored result for URL: {url}")
+        self.scraper_agent.metrics.inc("result_store_hits_total", match="url")
+        self.remember_result(url, stored)
+        return stored
+
+    def prefetch(self, url):
+        if self.result_store is None:
+            return None, None
+        scrape_result = self.scraper_agent.scrape_website(url)
+        if not scrape_result["success"]:
+            return scrape_result, None
+        self.compress_html(scrape_result)
+
+        stored = self.result_store.find_by_hash(content_hash(scrape_result["raw_content"]),
+                                                max_age=self.result_freshness)
+        if stored is None:
+            return scrape_result, None
+        logger.info(f"Content of {url} matches a stored analysis, skipping inference")
+        self.scraper_agent.metrics.inc("result_store_hits_total", match="content_hash")
+        stored["raw_content"] = scrape_result["raw_content"]
+        self.store_result(url, stored, scrape_result)
+        return scrape_result, stored
+
+    def compress_html(self, scrape_result):
+        html = scrape_result.pop("html", None) or ""
+        if scrape_result.get("page_meta") is None:
+            scrape_result["page_meta"] = page_metadata(parse_html(html))
+        scrape_result["compressed_html"] = zlib.compress(html.encode("utf-8")) if html else None
+
+    def store_result(self, url, result, scrape_result=None):
+        self.remember_result(url, result)
+        if self.result_store is not None:
+            compressed_html = scrape_result.get("compressed_html") if scrape_result else None
+            self.result_store.save(normalize_url(url), result, compressed_html=compressed_html)
+
+    def search_results(self, query, limit=20, max_age=None):
+        if self.result_store is None:
+            return []
+        return self.result_store.search(query, limit=limit, max_age=max_age)
+
+    def recent_result(self, url):
+        if not self.result_ttl:
+            return None
+        key = normalize_url(url)
+        with self.results_lock:
+            entry = self.recent_results.get(key)
+            if entry is None:
+                return None
+            stored_at, result = entry
+            if time.time() - stored_at > self.result_ttl:
+                del self.recent_results[key]
+                return None
+            self.recent_results.move_to_end(key)
+            self.scraper_agent.metrics.inc("recent_result_hits_total")
+            return dict(result)
+
+    def remember_result(self, url, result):
+        if not self.result_ttl or result.get("degraded"):
+            return
+        key = normalize_url(url)
+        with self.results_lock:
+            self.recent_results[key] = (time.time(), dict(result))
+            self.recent_results.move_to_end(key)
+            while len(self.recent_results) > self.max_recent_results:
+                self.recent_results.popitem(last=False)
+
+    def result_events(self, result):
+        yield {"event": "content", "raw_content": result["raw_content"]}
+        yield {"event": "metadata", "title": result["title"], "keywords": result["keywords"]}
+        yield {"event": "summary", "summary": result["summary"]}
+        yield {"event": "sentiment", "sentiment": result["sentiment"]}
+        yield {"event": "result", "result": result}
+
+    def url_host(self, url):
+        if not url.startswith(('http://', 'https://')):
+            url = 'https://' + url
+        return (urlparse(url).hostname or "").lower()
+
+    def process_websites(self, urls, max_workers=8, per_host_limit=2):
+        per_host_limit = max(1, per_host_limit)
+        pending = OrderedDict()
+        for url in urls:
+            pending.setdefault(self.url_host(url), deque()).append(url)
+        ready = deque(pending)
+        host_counts = {}
+        in_flight = {}
+
+        with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="agent-batch") as executor:
+            while ready or in_flight:
+                while ready and len(in_flight) < max_workers:
+                    host = ready.popleft()
+                    url = pending[host].popleft()
+                    host_counts[host] = host_counts.get(host, 0) + 1
+                    in_flight[executor.submit(self.process_website, url)] = (url, host)
+                    if pending[host] and host_counts[host] < per_host_limit:
+                        ready.append(host)
+
+                if not in_flight:
+                    break
+
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    url, host = in_flight.pop(future)
+                    host_counts[host] -= 1
+                    if pending[host] and host_counts[host] == per_host_limit - 1:
+                        ready.append(host)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        result = {"success": False, "error": f"Processing failed: {str(e)}"}
+                    yield url, result
+
+    def get_prometheus_metrics(self):
+        agent = self.scraper_agent
+        metrics = agent.metrics
+        for pool, stats in agent.get_connection_stats().items():
+            for name, value in stats.items():
+                metrics.set_gauge(f"http_{name}", value, pool=pool)
+        if agent.cache is not None:
+            for name, value in agent.cache.get_stats().items():
+                metrics.set_gauge(f"inference_cache_{name}", value)
+        if agent.fetch_cache is not None:
+            for name, value in agent.fetch_cache.get_stats().items():
+                metrics.set_gauge(f"fetch_cache_{name}", value)
+        if agent.chunk_store is not None:
+            for name, value in agent.chunk_store.get_stats().items():
+                metrics.set_gauge(f"chunk_store_{name}", value)
+        with self.in_flight_lock:
+            metrics.set_gauge("single_flight_in_flight", len(self.in_flight))
+        if self.result_store is not None:
+            for name, value in self.result_store.get_stats().items():
+                metrics.set_gauge(f"result_store_{name}", value)
+        if agent.batcher is not None:
+            for name, value in agent.batcher.get_stats().items():
+                metrics.set_gauge(f"micro_batch_{name}", value)
+        if agent.rate_limiters is not None:
+            for model, stats in agent.rate_limiters.get_stats().items():
+                for name, value in stats.items():
+                    metrics.set_gauge(f"rate_limiter_{name}", value, model=model)
+        if agent.circuit_breakers is not None:
+            for model, stats in agent.circuit_breakers.get_stats().items():
+                stats["state"] = STATE_VALUES[stats["state"]]
+                for name, value in stats.items():
+                    metrics.set_gauge(f"circuit_breaker_{name}", value, model=model)
+        return metrics.render_prometheus()
+
+    def close(self):
+        self.scraper_agent.close()
+
     def get_health_status(self):
         status = {
             "agent_manager": "healthy",
@@ -63,6 +351,23 @@ class AgentManager:
         try:
             if hasattr(self.scraper_agent, 'scrape_website'):
                 status["scraper_agent"] = "healthy"
+                status["connections"] = self.scraper_agent.get_connection_stats()
+                if self.scraper_agent.cache is not None:
+                    status["inference_cache"] = self.scraper_agent.cache.get_stats()
+                if self.scraper_agent.batcher is not None:
+                    status["micro_batching"] = self.scraper_agent.batcher.get_stats()
+                status["keyword_index"] = self.scraper_agent.keyword_extractor.get_stats()
+                status["metrics"] = self.scraper_agent.metrics.snapshot()
+                if self.scraper_agent.rate_limiters is not None:
+                    status["rate_limits"] = self.scraper_agent.rate_limiters.get_stats()
+                if self.scraper_agent.circuit_breakers is not None:
+                    status["circuit_breakers"] = self.scraper_agent.circuit_breakers.get_stats()
+                if self.scraper_agent.fetch_cache is not None:
+                    status["fetch_cache"] = self.scraper_agent.fetch_cache.get_stats()
+                if self.result_store is not None:
+                    status["result_store"] = self.result_store.get_stats()
+                if self.scraper_agent.chunk_store is not None:
+                    status["chunk_store"] = self.scraper_agent.chunk_store.get_stats()
             else:
                 status["scraper_agent"] = "not properly initialized"
         except Exception as e:
@@ -1,9 +1,11 @@
 import streamlit as st
-import time
-import pandas as pd
 import os
+import threading
+from collections import OrderedDict
 from agent_manager import AgentManager
 
+MAX_SHARED_AGENT_MANAGERS = 4
+
 st.set_page_config(
     page_title="Web Content Analyzer",
     page_icon="🔍",
@@ -68,32 +70,80 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
+@st.cache_resource(show_spinner=False)
+def agent_manager_pool():
+    return {"lock": threading.Lock(), "managers": OrderedDict()}
+
+def shared_agent_manager(hf_api_key):
+    pool = agent_manager_pool()
+    evicted = []
+    with pool["lock"]:
+        managers = pool["managers"]
+        if hf_api_key not in managers:
+            managers[hf_api_key] = AgentManager(hf_api_key=hf_api_key)
+        managers.move_to_end(hf_api_key)
+        manager = managers[hf_api_key]
+        while len(managers) > MAX_SHARED_AGENT_MANAGERS:
+            evicted.append(managers.popitem(last=False)[1])
+    for old_manager in evicted:
+        old_manager.close()
+    return manager
+
 def get_agent_manager():
     if 'hf_api_key' not in st.session_state:
         st.session_state.hf_api_key = os.environ.get("HF_API_KEY", "")
-    if ('agent_manager' not in st.session_state or 
-            st.session_state.get('current_api_key', '') != st.session_state.hf_api_key):
-        st.session_state.agent_manager = AgentManager(hf_api_key=st.session_state.hf_api_key)
-        st.session_state.current_api_key = st.session_state.hf_api_key
-    return st.session_state.agent_manager
+    return shared_agent_manager(st.session_state.hf_api_key)
 
 if 'results' not in st.session_state:
     st.session_state.results = None
 
-if 'is_loading' not in st.session_state:
-    st.session_state.is_loading = False
+def sentiment_class(sentiment_text):
+    if "POSITIVE" in sentiment_text:
+        return "sentiment-positive"
+    if "NEGATIVE" in sentiment_text:
+        return "sentiment-negative"
+    return "sentiment-neutral"
 
-def process_url():
-    url = st.session_state.url_input
-    if not url:
-        st.error("Please enter a URL.")
-        return
-    st.session_state.is_loading = True
-    st.session_state.results = None
+def keyword_tags(keywords):
+    tags = "".join(f'<div class="keyword-tag">{keyword}</div>' for keyword in keywords)
+    return f'<div class="keywords-container">{tags}</div>'
+
+def stream_analysis(url):
     agent_manager = get_agent_manager()
-    result = agent_manager.process_website(url)
-    st.session_state.results = result
-    st.session_state.is_loading = False
+    status = st.status("Fetching page...", expanded=True)
+    title_slot = st.empty()
+    keywords_slot = st.empty()
+    sentiment_slot = st.empty()
+    summary_slot = st.empty()
+    chunks_slot = st.empty()
+    chunk_summaries = {}
+    result = None
+
+    for event in agent_manager.stream_website(url):
+        kind = event["event"]
+        if kind == "content":
+            status.update(label=f"Fetched {len(event['raw_content']):,} characters. Analyzing...")
+        elif kind == "metadata":
+            title_slot.markdown(f"### {event['title']}")
+            keywords_slot.markdown(keyword_tags(event['keywords']), unsafe_allow_html=True)
+        elif kind == "sentiment":
+            sentiment_slot.markdown(f'<p class="{sentiment_class(event["sentiment"])}">{event["sentiment"]}</p>',
+                                    unsafe_allow_html=True)
+        elif kind == "chunk_summary":
+            chunk_summaries[event['index']] = event['summary']
+            status.update(label=f"Summarizing... {len(chunk_summaries)}/{event['total']} sections done")
+            chunks_slot.markdown("\n\n".join(chunk_summaries[i] for i in sorted(chunk_summaries)))
+        elif kind == "summary":
+            chunks_slot.empty()
+            summary_slot.markdown(f"#### Summary\n{event['summary']}")
+        elif kind == "result":
+            result = event['result']
+
+    if result and result["success"]:
+        status.update(label="Analysis complete", state="complete", expanded=False)
+    else:
+        status.update(label="Analysis failed", state="error", expanded=False)
+    return result
 
 st.title("🔍 Web Content Analyzer")
 st.subheader("Extract insights from any webpage using AI agents")
@@ -108,8 +158,6 @@ with st.sidebar:
     )
     if api_key != st.session_state.get('hf_api_key', ''):
         st.session_state.hf_api_key = api_key
-        if 'agent_manager' in st.session_state:
-            del st.session_state.agent_manager
     st.markdown("""
     ### About
     This application uses agentic AI to analyze web content. It extracts the main text, summarizes it, analyzes sentiment, and identifies key topics.
@@ -125,16 +173,27 @@ with st.sidebar:
     3. Generate a new API key
     4. Paste it here
     """)
+    st.subheader("Past analyses")
+    search_query = st.text_input("Search stored results", key="search_query", placeholder="keyword or topic")
+    if search_query:
+        for match in get_agent_manager().search_results(search_query, limit=10):
+            st.markdown(f"**[{match['title'] or match['url']}]({match['url']})**  \n{', '.join(match['keywords'][:5])}")
 
 st.text_input("Enter website URL:", key="url_input", 
               placeholder="https://example.com", 
               help="Enter the full URL including http:// or https://")
 
-st.button("Analyze Website", on_click=process_url, key="process_button")
-
-if st.session_state.is_loading:
-    with st.spinner("Analyzing website content... This may take a minute."):
-        time.sleep(0.5)
+if st.button("Analyze Website", key="process_button"):
+    url = st.session_state.url_input
+    if not url:
+        st.error("Please enter a URL.")
+    else:
+        st.session_state.results = None
+        live_view = st.empty()
+        with live_view.container():
+            result = stream_analysis(url)
+        live_view.empty()
+        st.session_state.results = result
 
 if st.session_state.results:
     results = st.session_state.results
@@ -157,13 +216,8 @@ if st.session_state.results:
                     """, unsafe_allow_html=True)
             st.markdown("### Sentiment Analysis")
             sentiment_text = results['sentiment']
-            sentiment_class = "sentiment-neutral"
-            if "POSITIVE" in sentiment_text:
-                sentiment_class = "sentiment-positive"
-            elif "NEGATIVE" in sentiment_text:
-                sentiment_class = "sentiment-negative"
             st.markdown(f"""
-                <p class="{sentiment_class}">{sentiment_text}</p>
+                <p class="{sentiment_class(sentiment_text)}">{sentiment_text}</p>
             """, unsafe_allow_html=True)
             if "POSITIVE" in sentiment_text:
                 st.markdown("The content has an overall positive tone.")
@@ -0,0 +1,118 @@
+import json
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+
+    def __init__(self, send_batch, max_batch_size=8, max_wait=0.01, max_concurrent_batches=4):
+        self.send_batch = send_batch
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait
+        self.pending = {}
+        self.cond = threading.Condition()
+        self.closed = False
+        self.stats = {"requests": 0, "batches": 0, "batched_items": 0, "largest_batch": 0}
+        self.executor = ThreadPoolExecutor(max_workers=max_concurrent_batches, thread_name_prefix="micro-batch")
+        self.thread = threading.Thread(target=self.run, name="micro-batcher", daemon=True)
+        self.thread.start()
+
+    @staticmethod
+    def accepts(payload):
+        return isinstance(payload.get("inputs"), str) and set(payload) <= {"inputs", "parameters"}
+
+    def submit(self, model, payload):
+        future = Future()
+        key = (model, json.dumps(payload.get("parameters") or {}, sort_keys=True))
+        with self.cond:
+            if self.closed:
+                raise RuntimeError("MicroBatcher is closed")
+            self.pending.setdefault(key, []).append((payload["inputs"], future, time.monotonic()))
+            self.stats["requests"] += 1
+            self.cond.notify()
+        return future
+
+    def query(self, model, payload, timeout=None):
+        return self.submit(model, payload).result(timeout=timeout)
+
+    def run(self):
+        while True:
+            ready = []
+            with self.cond:
+                while not self.pending and not self.closed:
+                    self.cond.wait()
+                if self.closed and not self.pending:
+                    return
+
+                now = time.monotonic()
+                next_deadline = None
+                for key in list(self.pending):
+                    items = self.pending[key]
+                    deadline = items[0][2] + self.max_wait
+                    if len(items) >= self.max_batch_size or deadline <= now or self.closed:
+                        ready.append((key, items[:self.max_batch_size]))
+                        remaining = items[self.max_batch_size:]
+                        if remaining:
+                            self.pending[key] = remaining
+                        else:
+                            del self.pending[key]
+                    elif next_deadline is None or deadline < next_deadline:
+                        next_deadline = deadline
+
+                if not ready:
+                    self.cond.wait(max(0.0, next_deadline - now))
+                    continue
+
+            for key, batch in ready:
+                self.executor.submit(self.dispatch, key, batch)
+
+    def dispatch(self, key, batch):
+        model, parameters_json = key
+        parameters = json.loads(parameters_json)
+        with self.cond:
+            self.stats["batches"] += 1
+            self.stats["batched_items"] += len(batch)
+            self.stats["largest_batch"] = max(self.stats["largest_batch"], len(batch))
+
+        try:
+            if len(batch) == 1:
+                responses = [self.send_batch(model, self.build_payload(batch[0][0], parameters))]
+            else:
+                response = self.send_batch(model, self.build_payload([item[0] for item in batch], parameters))
+                if isinstance(response, list) and len(response) == len(batch):
+                    responses = [[item] for item in response]
+                elif isinstance(response, dict) and "error" in response:
+                    responses = [response] * len(batch)
+                else:
+                    responses = [self.send_batch(model, self.build_payload(item[0], parameters)) for item in batch]
+        except Exception as e:
+            logger.error(f"Micro-batch for {model} failed: {str(e)}")
+            responses = [{"error": f"API request failed: {str(e)}"}] * len(batch)
+
+        for (_, future, _), response in zip(batch, responses):
+            future.set_result(response)
+
+    @staticmethod
+    def build_payload(inputs, parameters):
+        payload = {"inputs": inputs}
+        if parameters:
+            payload["parameters"] = parameters
+        return payload
+
+    def get_stats(self):
+        with self.cond:
+            stats = dict(self.stats)
+            stats["queued"] = sum(len(items) for items in self.pending.values())
+        stats["average_batch_size"] = round(stats["batched_items"] / stats["batches"], 2) if stats["batches"] else 0.0
+        return stats
+
+    def close(self):
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+        self.thread.join()
+        self.executor.shutdown(wait=True)
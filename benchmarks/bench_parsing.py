@@ -0,0 +1,85 @@
+import argparse
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import trafilatura
+from html_document import parse_html, page_metadata, visible_text
+
+
+def make_page(paragraphs):
+    body = "\n".join(
+        f"<div class='post'><p>Paragraph {i} covers solar panels, grid storage and the cost of batteries. "
+        f"<a href='/item/{i}'>Read more</a> <span>Updated {i % 28 + 1} March</span></p></div>"
+        for i in range(paragraphs)
+    )
+    return (
+        "<html><head><title>Energy report</title><meta name='keywords' content='solar, storage'>"
+        "<style>.post{margin:0}</style><script>var tracking = {enabled: true};</script></head>"
+        f"<body><nav><ul>{''.join(f'<li><a href=/s/{i}>Section {i}</a></li>' for i in range(50))}</ul></nav>"
+        f"<h1>Energy report</h1><article>{body}</article><footer>Copyright</footer></body></html>"
+    )
+
+
+def legacy_pipeline(html, force_fallback=False):
+    from bs4 import BeautifulSoup
+
+    raw_content = None if force_fallback else trafilatura.extract(html, include_tables=False, include_images=False)
+    if not raw_content:
+        soup = BeautifulSoup(html, 'html.parser')
+        for script in soup(["script", "style"]):
+            script.extract()
+        raw_content = soup.get_text(separator='\n')
+        raw_content = re.sub(r'\n+', '\n', raw_content)
+        raw_content = re.sub(r'\s+', ' ', raw_content)
+
+    soup = BeautifulSoup(html, 'html.parser')
+    title = soup.title.string if soup.title else ""
+    h1 = soup.find('h1')
+    if h1 and h1.text.strip():
+        title = h1.text.strip() if not title else title
+    keywords_tag = soup.find('meta', attrs={'name': 'keywords'})
+    keywords = [k.strip() for k in keywords_tag['content'].split(',')] if keywords_tag else []
+    return raw_content, title, keywords
+
+
+def single_parse_pipeline(html, force_fallback=False):
+    tree = parse_html(html)
+    meta = page_metadata(tree)
+    raw_content = None if force_fallback else trafilatura.extract(tree, include_tables=False, include_images=False)
+    if not raw_content:
+        raw_content = visible_text(tree)
+    return raw_content, meta["title"] or meta["h1"], meta["keywords"]
+
+
+def cpu_time_per_page(pipeline, html, repeat, force_fallback):
+    pipeline(html, force_fallback)
+    started = time.process_time()
+    for _ in range(repeat):
+        pipeline(html, force_fallback)
+    return (time.process_time() - started) / repeat
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="CPU time per page: legacy multi-parse vs single lxml parse.")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 500, 5000], help="Paragraphs per page")
+    args = parser.parse_args(argv)
+
+    print(f"{'page':>12} {'path':>10} {'legacy ms':>10} {'single ms':>10} {'speedup':>8}")
+    for paragraphs in args.sizes:
+        html = make_page(paragraphs)
+        repeat = max(1, args.repeat * 50 // paragraphs) if paragraphs > 50 else args.repeat
+        for force_fallback in (False, True):
+            legacy = cpu_time_per_page(legacy_pipeline, html, repeat, force_fallback)
+            single = cpu_time_per_page(single_parse_pipeline, html, repeat, force_fallback)
+            path = "fallback" if force_fallback else "trafilatura"
+            print(f"{len(html) // 1024:>9} KB {path:>10} {legacy * 1000:>10.1f} {single * 1000:>10.1f} "
+                  f"{legacy / single:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from html_document import parse_html, visible_text
+from scraper_agent import ScraperAgent
+from stub_server import CORPUS_DIR, fake_output
+
+
+class CountingBackend:
+
+    name = "counting"
+
+    def __init__(self):
+        self.calls = {}
+
+    def query(self, model, payload, max_retries=None, retry_delay=None):
+        inputs = payload["inputs"]
+        items = inputs if isinstance(inputs, list) else [inputs]
+        self.calls[model] = self.calls.get(model, 0) + len(items)
+        outputs = [fake_output(model, item) for item in items]
+        if "bart" in model:
+            outputs = [dict(output, summary_text=" ".join(item.split()[:8] + ["..."] + item.split()[-8:])) for output, item in zip(outputs, items)]
+        return outputs if isinstance(inputs, list) else outputs[0] if isinstance(outputs[0], list) else [outputs[0]]
+
+
+def build_agent(backend):
+    models = ("facebook/bart-large-cnn", "distilbert-base-uncased-finetuned-sst-2-english",
+              "mistralai/Mixtral-8x7B-Instruct-v0.1")
+    return ScraperAgent(use_cache=False, use_fetch_cache=False, micro_batching=False, use_tokenizer=False,
+                        backends={model: backend for model in models})
+
+
+def analyze(agent, backend, url, text):
+    backend.calls.clear()
+    result = agent.process_url(url, {"success": True, "raw_content": text, "html": "",
+                                     "page_meta": {"title": "Check", "h1": None, "keywords": ["check"]}})
+    return result, backend.calls.get(agent.summarization_model, 0)
+
+
+def check_edits(page, runs, edit):
+    with open(os.path.join(CORPUS_DIR, page), encoding="utf-8") as f:
+        text = visible_text(parse_html(f.read()))
+    backend = CountingBackend()
+    agent = build_agent(backend)
+    url = f"https://example.com/{edit}/{page}"
+    analyze(agent, backend, url, text)
+
+    failures = []
+    for n in range(1, runs + 1):
+        sentence = f"Update {n}: shares fell."
+        text = f"{text} {sentence}" if edit == "append" else f"{sentence} {text}"
+        result, bart_calls = analyze(agent, backend, url, text)
+        changes = result["changes"]
+        fresh_chunks = len(agent.chunk_text(text))
+        if bart_calls == 0 or changes["summary_reused"]:
+            failures.append(f"{edit} run {n}: edit was not summarized ({bart_calls} calls, {changes})")
+        if sentence not in " ".join(chunk["text"] for chunk in agent.chunk_store.get(url)["chunks"]):
+            failures.append(f"{edit} run {n}: '{sentence}' is not covered by a summarized chunk")
+        if changes["chunks_total"] > fresh_chunks + 1:
+            failures.append(f"{edit} run {n}: {changes['chunks_total']} chunks, fresh chunking gives {fresh_chunks}")
+        print(f"{edit} run {n}: {changes['chunks_total']} chunks (fresh {fresh_chunks}), "
+              f"{changes['chunks_changed']} changed, {bart_calls} summarizer inputs")
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check that incremental re-analysis summarizes small edits.")
+    parser.add_argument("--page", default="article.html", help="Corpus page to edit")
+    parser.add_argument("--runs", type=int, default=5, help="Edits applied one after another")
+    args = parser.parse_args(argv)
+
+    failures = check_edits(args.page, args.runs, "append") + check_edits(args.page, args.runs, "prepend")
+    for failure in failures:
+        print(f"FAIL {failure}")
+    print("ok" if not failures else f"{len(failures)} failures")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
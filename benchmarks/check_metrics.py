@@ -0,0 +1,44 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from metrics import Metrics
+
+
+def check_mixed_labels():
+    metrics = Metrics()
+    model = "facebook/bart-large-cnn"
+    metrics.inc("hf_requests_total", model=model, status=200)
+    metrics.inc("hf_requests_total", model=model, status="exception")
+    metrics.inc("hf_requests_total", model=model, status=503)
+    metrics.inc("jobs_completed_total", success=True)
+    metrics.inc("jobs_completed_total", success=None)
+    metrics.observe("request_seconds", 0.2, status=200)
+    metrics.observe("request_seconds", 0.4, status="exception")
+
+    failures = []
+    try:
+        snapshot = metrics.snapshot()
+        text = metrics.render_prometheus()
+    except TypeError as e:
+        return [f"mixed label types broke the export: {e}"]
+    if len(snapshot["counters"]["hf_requests_total"]) != 3:
+        failures.append(f"expected 3 hf_requests_total series, got {snapshot['counters']['hf_requests_total']}")
+    if metrics.counter_value("hf_requests_total", model=model, status=200) != 1:
+        failures.append("counter lookup with an int label value did not find the series")
+    if 'status="exception"' not in text or 'status="503"' not in text:
+        failures.append("Prometheus output is missing a status series")
+    return failures
+
+
+def main():
+    failures = check_mixed_labels()
+    for failure in failures:
+        print(f"FAIL {failure}")
+    print("ok" if not failures else f"{len(failures)} failures")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
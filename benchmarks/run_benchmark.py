@@ -0,0 +1,145 @@
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from metrics import Metrics
+from rate_limiter import RateLimiterRegistry
+from scraper_agent import ScraperAgent
+from stub_server import StubConfig, start_stub_server, corpus_pages
+
+
+class RecordingMetrics(Metrics):
+
+    def __init__(self):
+        super().__init__()
+        self.samples = {}
+
+    def observe(self, name, value, **labels):
+        super().observe(name, value, **labels)
+        if name == "stage_latency_seconds":
+            with self.lock:
+                self.samples.setdefault(labels["stage"], []).append(value)
+
+
+def percentile(values, q):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(q * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def summarize(values):
+    return {
+        "count": len(values),
+        "p50_ms": round(percentile(values, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(values, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(values, 0.99) * 1000, 2),
+    }
+
+
+def run(args):
+    config = StubConfig(latency=args.latency, jitter=args.jitter, rate_limit_rate=args.rate_limit_rate,
+                        error_rate=args.error_rate, retry_after=0, seed=args.seed)
+    server = start_stub_server(config)
+    base = f"http://127.0.0.1:{server.server_port}"
+
+    metrics = RecordingMetrics()
+    agent = ScraperAgent(
+        concurrent_stages=not args.serial_stages,
+        use_cache=args.cache,
+        use_fetch_cache=args.cache,
+        incremental=args.cache,
+        micro_batching=not args.no_micro_batching,
+        use_tokenizer=False,
+        metrics=metrics,
+        rate_limiters=RateLimiterRegistry(rate=args.limiter_rate, burst=args.limiter_rate,
+                                          concurrency=args.limiter_concurrency),
+        hedge_percentile=args.hedge_percentile,
+    )
+    agent.hf_api_url = f"{base}/models/"
+
+    pages = args.pages or corpus_pages()
+    urls = [f"{base}/pages/{page}" for page in pages] * args.iterations
+    failures = []
+
+    def timed(url):
+        started = time.perf_counter()
+        result = agent.process_url(url)
+        return url, result, time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        latencies = []
+        for url, result, elapsed in executor.map(timed, urls):
+            latencies.append(elapsed)
+            if not result["success"]:
+                failures.append({"url": url.rsplit("/", 1)[-1], "error": result["error"][:120]})
+    wall_time = time.perf_counter() - started
+    server.shutdown()
+
+    report = {
+        "urls": len(urls),
+        "workers": args.workers,
+        "wall_time_s": round(wall_time, 3),
+        "throughput_urls_per_s": round(len(urls) / wall_time, 3),
+        "process_url": summarize(latencies),
+        "stages": {stage: summarize(values) for stage, values in sorted(metrics.samples.items())
+                   if stage != "process_url"},
+        "stub": dict(config.counts),
+        "hedging": {name: sum(values.values()) for name, values in metrics.snapshot()["counters"].items()
+                    if name.startswith("hedge")},
+        "failures": failures,
+    }
+    return report
+
+
+def print_report(report):
+    print(f"{report['urls']} URLs with {report['workers']} workers in {report['wall_time_s']}s "
+          f"-> {report['throughput_urls_per_s']} URLs/s")
+    print(f"{'stage':>12} {'count':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    rows = [("process_url", report["process_url"])] + list(report["stages"].items())
+    for stage, stats in rows:
+        print(f"{stage:>12} {stats['count']:>6} {stats['p50_ms']:>9} {stats['p95_ms']:>9} {stats['p99_ms']:>9}")
+    print(f"stub counters: {report['stub']}")
+    if report["hedging"]:
+        print(f"hedging: {report['hedging']}")
+    for failure in report["failures"]:
+        print(f"failed: {failure['url']}: {failure['error']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline benchmark of ScraperAgent against a local stub server.")
+    parser.add_argument("--iterations", type=int, default=3, help="Passes over the corpus")
+    parser.add_argument("--workers", type=int, default=4, help="URLs processed concurrently")
+    parser.add_argument("--pages", nargs="*", help="Corpus pages to use (default: all)")
+    parser.add_argument("--latency", type=float, default=0.05, help="Stub inference latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.02, help="Uniform latency jitter in seconds")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fraction of calls answered with 429")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of calls answered with 503")
+    parser.add_argument("--limiter-rate", type=float, default=20.0, help="Initial per-model request rate")
+    parser.add_argument("--limiter-concurrency", type=int, default=8, help="Initial per-model concurrency")
+    parser.add_argument("--hedge-percentile", type=float, default=None,
+                        help="Start the Mixtral fallback when a primary model call exceeds this latency percentile")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--serial-stages", action="store_true", help="Run metadata/summary/sentiment one by one")
+    parser.add_argument("--no-micro-batching", action="store_true")
+    parser.add_argument("--cache", action="store_true", help="Enable inference/fetch caches and incremental re-analysis")
+    parser.add_argument("--json", dest="json_path", help="Also write the report to this JSON file")
+    args = parser.parse_args(argv)
+
+    report = run(args)
+    print_report(report)
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
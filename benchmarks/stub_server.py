@@ -0,0 +1,142 @@
+import argparse
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "corpus")
+
+
+class StubConfig:
+
+    def __init__(self, latency=0.05, jitter=0.02, rate_limit_rate=0.0, error_rate=0.0, retry_after=0,
+                 page_latency=0.01, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit_rate = rate_limit_rate
+        self.error_rate = error_rate
+        self.retry_after = retry_after
+        self.page_latency = page_latency
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.counts = {"inference": 0, "rate_limited": 0, "errors": 0, "pages": 0}
+
+    def roll(self):
+        with self.lock:
+            return self.random.random(), self.random.uniform(-self.jitter, self.jitter)
+
+    def count(self, name):
+        with self.lock:
+            self.counts[name] += 1
+
+
+def fake_output(model, text):
+    words = text.split()
+    if "bart" in model or "summar" in model:
+        return {"summary_text": " ".join(words[:40]) + "."}
+    if "sst" in model or "sentiment" in model or "distilbert" in model:
+        score = 0.5 + (len(text) % 50) / 100
+        return [{"label": "POSITIVE", "score": score}, {"label": "NEGATIVE", "score": 1 - score}]
+    if "keywords" in text and "title" in text:
+        return {"generated_text": '{"title": "Stub title", "keywords": ["stub", "benchmark", "corpus"]}'}
+    return {"generated_text": "NEUTRAL"}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    config = StubConfig()
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_body(self, status, body, content_type="application/json", headers=()):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        model = self.path.split("/models/", 1)[-1]
+        config = self.config
+        config.count("inference")
+
+        roll, jitter = config.roll()
+        time.sleep(max(0.0, config.latency + jitter))
+
+        if roll < config.rate_limit_rate:
+            config.count("rate_limited")
+            body = json.dumps({"error": "Rate limit reached"}).encode()
+            return self.send_body(429, body, headers=[("Retry-After", str(config.retry_after))])
+        if roll < config.rate_limit_rate + config.error_rate:
+            config.count("errors")
+            body = json.dumps({"error": "Model is currently loading", "estimated_time": 1.0}).encode()
+            return self.send_body(503, body)
+
+        inputs = payload.get("inputs", "")
+        if isinstance(inputs, list):
+            output = [fake_output(model, text) for text in inputs]
+        else:
+            output = fake_output(model, inputs)
+            output = [output] if isinstance(output, list) else [output]
+        self.send_body(200, json.dumps(output).encode())
+
+    def do_GET(self):
+        config = self.config
+        config.count("pages")
+        name = os.path.basename(self.path.split("?", 1)[0])
+        path = os.path.join(CORPUS_DIR, name)
+        if not os.path.isfile(path):
+            return self.send_body(404, b"not found", "text/plain")
+
+        time.sleep(config.page_latency)
+        with open(path, "rb") as f:
+            body = f.read()
+        etag = '"' + hashlib.sha1(body).hexdigest()[:16] + '"'
+        if self.headers.get("If-None-Match") == etag:
+            return self.send_body(304, b"", "text/html", headers=[("ETag", etag)])
+        self.send_body(200, body, "text/html; charset=utf-8", headers=[("ETag", etag)])
+
+
+def start_stub_server(config=None, host="127.0.0.1", port=0):
+    handler = type("ConfiguredStubHandler", (StubHandler,), {"config": config or StubConfig()})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, name="stub-server", daemon=True)
+    thread.start()
+    return server
+
+
+def corpus_pages():
+    return sorted(name for name in os.listdir(CORPUS_DIR) if name.endswith(".html"))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the benchmark corpus and a fake inference API.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--jitter", type=float, default=0.02)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args(argv)
+
+    config = StubConfig(latency=args.latency, jitter=args.jitter, rate_limit_rate=args.rate_limit_rate,
+                        error_rate=args.error_rate)
+    server = start_stub_server(config, port=args.port)
+    print(f"Stub server on http://127.0.0.1:{server.server_port} (models at /models/, pages at /pages/)")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
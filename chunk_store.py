@@ -0,0 +1,49 @@
+import json
+import sqlite3
+import threading
+import time
+import zlib
+
+
+class ChunkStore:
+
+    def __init__(self, db_path=None, max_entries=5000):
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.stats = {"lookups": 0, "hits": 0, "stores": 0}
+        self.db = sqlite3.connect(db_path or ":memory:", check_same_thread=False)
+        if db_path:
+            self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("CREATE TABLE IF NOT EXISTS chunk_state (url TEXT PRIMARY KEY, state BLOB, analyzed_at REAL)")
+        self.db.execute("CREATE INDEX IF NOT EXISTS chunk_state_analyzed ON chunk_state (analyzed_at)")
+        self.db.commit()
+
+    def get(self, url):
+        with self.lock:
+            self.stats["lookups"] += 1
+            row = self.db.execute("SELECT state, analyzed_at FROM chunk_state WHERE url = ?", (url,)).fetchone()
+            if row is None:
+                return None
+            self.stats["hits"] += 1
+        state = json.loads(zlib.decompress(row[0]).decode("utf-8"))
+        state["analyzed_at"] = row[1]
+        return state
+
+    def set(self, url, state):
+        blob = zlib.compress(json.dumps(state, ensure_ascii=False).encode("utf-8"))
+        with self.lock:
+            self.stats["stores"] += 1
+            self.db.execute("INSERT OR REPLACE INTO chunk_state (url, state, analyzed_at) VALUES (?, ?, ?)",
+                            (url, blob, time.time()))
+            self.db.execute(
+                "DELETE FROM chunk_state WHERE url IN ("
+                "SELECT url FROM chunk_state ORDER BY analyzed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+            self.db.commit()
+
+    def get_stats(self):
+        with self.lock:
+            stats = dict(self.stats)
+            stats["entries"] = self.db.execute("SELECT COUNT(*) FROM chunk_state").fetchone()[0]
+        return stats
@@ -0,0 +1,137 @@
+import logging
+import re
+import threading
+
+logger = logging.getLogger(__name__)
+
+SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?])\s+')
+WORD_PIECES = re.compile(r"\w+|[^\w\s]")
+
+
+class TokenCounter:
+
+    def __init__(self, model_name=None, use_tokenizer=True):
+        self.model_name = model_name
+        self.use_tokenizer = use_tokenizer and model_name is not None
+        self.tokenizer = None
+        self.loaded = False
+        self.lock = threading.Lock()
+
+    def load(self):
+        with self.lock:
+            if self.loaded:
+                return self.tokenizer
+            self.loaded = True
+            if self.use_tokenizer:
+                try:
+                    from transformers import AutoTokenizer
+                    self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+                except Exception as e:
+                    logger.warning(f"Tokenizer for {self.model_name} unavailable, estimating token counts: {str(e)}")
+            return self.tokenizer
+
+    def count(self, text):
+        tokenizer = self.load()
+        if tokenizer is not None:
+            return len(tokenizer.encode(text, add_special_tokens=False))
+        pieces = WORD_PIECES.findall(text)
+        return len(pieces) + sum(len(piece) // 8 for piece in pieces)
+
+
+def split_oversized(sentence, max_tokens, count):
+    pieces = []
+    current = []
+    current_tokens = 0
+    for word in sentence.split():
+        word_tokens = count(" " + word)
+        if current and current_tokens + word_tokens > max_tokens:
+            pieces.append(" ".join(current))
+            current = []
+            current_tokens = 0
+        current.append(word)
+        current_tokens += word_tokens
+    if current:
+        pieces.append(" ".join(current))
+    return pieces
+
+
+def pack_segments(segments, max_tokens, count):
+    chunks = []
+    current = []
+    current_tokens = 0
+    for segment in segments:
+        segment_tokens = count(" " + segment)
+        if segment_tokens > max_tokens:
+            parts = split_oversized(segment, max_tokens, count)
+        else:
+            parts = [segment]
+        for part in parts:
+            part_tokens = segment_tokens if len(parts) == 1 else count(" " + part)
+            if current and current_tokens + part_tokens > max_tokens:
+                chunks.append(" ".join(current))
+                current = []
+                current_tokens = 0
+            current.append(part)
+            current_tokens += part_tokens
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+
+def split_sentences(text):
+    return [sentence for sentence in SENTENCE_BOUNDARY.split(text) if sentence.strip()]
+
+
+def chunk_by_tokens(text, max_tokens, count):
+    return pack_segments(split_sentences(text), max_tokens, count)
+
+
+def rechunk_by_tokens(text, previous_chunks, max_tokens, count):
+    sentences = split_sentences(text)
+    joined = " ".join(sentences)
+    starts = {}
+    ends = {}
+    offset = 0
+    for i, sentence in enumerate(sentences):
+        starts[offset] = i
+        offset += len(sentence)
+        ends[offset] = i + 1
+        offset += 1
+
+    spans = []
+    position = 0
+    search_from = 0
+    for previous in previous_chunks:
+        found = joined.find(previous, search_from)
+        while found != -1 and (found not in starts or found + len(previous) not in ends):
+            found = joined.find(previous, found + 1)
+        if found == -1:
+            continue
+        if starts[found] > position:
+            spans.append([False, position, starts[found]])
+        spans.append([True, starts[found], ends[found + len(previous)]])
+        position = ends[found + len(previous)]
+        search_from = found + len(previous)
+    if position < len(sentences):
+        spans.append([False, position, len(sentences)])
+
+    merged = []
+    i = 0
+    while i < len(spans):
+        kept, start, end = spans[i]
+        if not kept:
+            if i + 1 < len(spans):
+                end = spans[i + 1][2]
+                i += 1
+            elif merged and merged[-1][0]:
+                start = merged.pop()[1]
+        merged.append([kept, start, end])
+        i += 1
+
+    chunks = []
+    for kept, start, end in merged:
+        if kept:
+            chunks.append(" ".join(sentences[start:end]))
+        else:
+            chunks.extend(pack_segments(sentences[start:end], max_tokens, count))
+    return chunks
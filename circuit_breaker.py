@@ -0,0 +1,109 @@
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitBreaker:
+
+    def __init__(self, name="", failure_threshold=5, reset_timeout=30.0, max_reset_timeout=300.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.open_for = reset_timeout
+        self.probe_in_flight = False
+        self.stats = {"opened": 0, "rejected": 0, "probes": 0}
+        self.lock = threading.Lock()
+
+    def is_open(self):
+        with self.lock:
+            if self.state == OPEN and time.monotonic() - self.opened_at < self.open_for:
+                self.stats["rejected"] += 1
+                return True
+            if self.state == HALF_OPEN and self.probe_in_flight:
+                self.stats["rejected"] += 1
+                return True
+            return False
+
+    def allow(self):
+        with self.lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN:
+                if time.monotonic() - self.opened_at < self.open_for:
+                    self.stats["rejected"] += 1
+                    return False
+                self.state = HALF_OPEN
+            if self.probe_in_flight:
+                self.stats["rejected"] += 1
+                return False
+            self.probe_in_flight = True
+            self.stats["probes"] += 1
+            return True
+
+    def record(self, success):
+        with self.lock:
+            if self.state == HALF_OPEN:
+                self.probe_in_flight = False
+            if success is None:
+                return
+            if success:
+                if self.state != CLOSED:
+                    logger.info(f"Circuit for {self.name} closed after a successful probe")
+                self.state = CLOSED
+                self.failures = 0
+                self.open_for = self.reset_timeout
+                return
+
+            self.failures += 1
+            if self.state == HALF_OPEN:
+                self.open_for = min(self.max_reset_timeout, self.open_for * 2)
+                self.trip()
+            elif self.state == CLOSED and self.failures >= self.failure_threshold:
+                self.trip()
+
+    def trip(self):
+        self.state = OPEN
+        self.opened_at = time.monotonic()
+        self.stats["opened"] += 1
+        logger.warning(f"Circuit for {self.name} opened after {self.failures} failures; "
+                       f"retrying in {self.open_for:g}s")
+
+    def get_stats(self):
+        with self.lock:
+            stats = dict(self.stats)
+            stats.update({"state": self.state, "consecutive_failures": self.failures})
+        return stats
+
+
+class CircuitBreakerRegistry:
+
+    def __init__(self, **defaults):
+        self.defaults = defaults
+        self.breakers = {}
+        self.lock = threading.Lock()
+
+    def get(self, model):
+        with self.lock:
+            breaker = self.breakers.get(model)
+            if breaker is None:
+                breaker = self.breakers[model] = CircuitBreaker(name=model, **self.defaults)
+            return breaker
+
+    def get_stats(self):
+        with self.lock:
+            breakers = dict(self.breakers)
+        return {model: breaker.get_stats() for model, breaker in breakers.items()}
+
+
+CIRCUIT_BREAKERS = CircuitBreakerRegistry()
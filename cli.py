@@ -0,0 +1,91 @@
+import argparse
+import json
+import logging
+import os
+import sys
+from agent_manager import AgentManager
+
+logger = logging.getLogger(__name__)
+
+
+def read_urls(path):
+    urls = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            if line.startswith("{"):
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(f"Skipping malformed JSONL line: {line[:80]}")
+                    continue
+                url = record.get("url")
+                if url:
+                    urls.append(url)
+            else:
+                urls.append(line)
+    return urls
+
+
+def read_completed_urls(path):
+    completed = set()
+    if not os.path.exists(path):
+        return completed
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if record.get("url"):
+                completed.add(record["url"])
+    return completed
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Analyze a list of websites and write the results as JSONL.")
+    parser.add_argument("input", help="File with one URL per line, or JSONL records with a 'url' field")
+    parser.add_argument("-o", "--output", required=True, help="JSONL file to append results to")
+    parser.add_argument("--workers", type=int, default=8, help="Number of URLs processed at once")
+    parser.add_argument("--per-host", type=int, default=2, help="Maximum concurrent URLs per host")
+    parser.add_argument("--no-resume", action="store_true", help="Reprocess URLs already present in the output")
+    parser.add_argument("--no-raw-content", action="store_true", help="Leave raw_content out of the output records")
+    parser.add_argument("--api-key", default=None, help="Hugging Face API key (defaults to HF_API_KEY)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    urls = list(dict.fromkeys(read_urls(args.input)))
+
+    if not args.no_resume:
+        completed = read_completed_urls(args.output)
+        if completed:
+            logger.info(f"Skipping {len(completed)} URLs already in {args.output}")
+        urls = [url for url in urls if url not in completed]
+
+    if not urls:
+        logger.info("Nothing to process")
+        return 0
+
+    agent_manager = AgentManager(hf_api_key=args.api_key)
+    failures = 0
+
+    with open(args.output, "a", encoding="utf-8") as out:
+        for url, result in agent_manager.process_websites(urls, max_workers=args.workers,
+                                                          per_host_limit=args.per_host):
+            if args.no_raw_content:
+                result.pop("raw_content", None)
+            if not result.get("success"):
+                failures += 1
+            out.write(json.dumps({"url": url, **result}, ensure_ascii=False) + "\n")
+            out.flush()
+
+    logger.info(f"Processed {len(urls)} URLs ({failures} failed), results in {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+import hashlib
+import logging
+import re
+import time
+from collections import deque
+from urllib.parse import urlsplit
+from url_utils import normalize_url, site_of
+
+logger = logging.getLogger(__name__)
+
+SKIPPED_EXTENSIONS = (
+    ".pdf", ".jpg", ".jpeg", ".png", ".gif", ".svg", ".webp", ".ico", ".zip", ".gz", ".tar", ".mp3", ".mp4",
+    ".avi", ".mov", ".css", ".js", ".json", ".xml", ".rss", ".doc", ".docx", ".xls", ".xlsx", ".ppt", ".pptx",
+)
+SHINGLE_WORDS = re.compile(r"\w+")
+
+
+def simhash(text, shingle_size=3):
+    words = SHINGLE_WORDS.findall(text.lower())
+    if len(words) < shingle_size:
+        words = words + [""] * (shingle_size - len(words))
+    weights = [0] * 64
+    for i in range(len(words) - shingle_size + 1):
+        shingle = " ".join(words[i:i + shingle_size])
+        value = int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(64):
+            weights[bit] += 1 if value >> bit & 1 else -1
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def hamming_distance(a, b):
+    return bin(a ^ b).count("1")
+
+
+class SiteCrawler:
+
+    def __init__(self, agent, max_depth=2, max_pages=20, politeness_delay=1.0, near_duplicate_distance=3):
+        self.agent = agent
+        self.max_depth = max_depth
+        self.max_pages = max_pages
+        self.politeness_delay = politeness_delay
+        self.near_duplicate_distance = near_duplicate_distance
+        self.last_fetch = {}
+
+    def crawlable(self, url, site):
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https"):
+            return False
+        if site_of(url) != site:
+            return False
+        return not parts.path.lower().endswith(SKIPPED_EXTENSIONS)
+
+    def wait_for_host(self, url):
+        host = urlsplit(url).hostname
+        last = self.last_fetch.get(host)
+        if last is not None:
+            delay = self.politeness_delay - (time.monotonic() - last)
+            if delay > 0:
+                time.sleep(delay)
+        self.last_fetch[host] = time.monotonic()
+
+    def find_near_duplicate(self, fingerprint, fingerprints):
+        for url, seen in fingerprints:
+            if hamming_distance(fingerprint, seen) <= self.near_duplicate_distance:
+                return url
+        return None
+
+    def crawl(self, seed_url):
+        seed = normalize_url(seed_url)
+        site = site_of(seed)
+        frontier = deque([(seed, 0)])
+        queued = {seed}
+        fingerprints = []
+        fetched = 0
+
+        while frontier and fetched < self.max_pages:
+            url, depth = frontier.popleft()
+            self.wait_for_host(url)
+            scrape_result = self.agent.scrape_website(url, with_links=True)
+            fetched += 1
+
+            if not scrape_result["success"]:
+                yield {"url": url, "depth": depth, "status": "failed", "result": {
+                    "success": False, "error": scrape_result["error"]}}
+                continue
+
+            if depth < self.max_depth:
+                for link in scrape_result.get("links") or []:
+                    link = normalize_url(link)
+                    if link not in queued and self.crawlable(link, site):
+                        queued.add(link)
+                        frontier.append((link, depth + 1))
+
+            fingerprint = simhash(scrape_result["raw_content"] or "")
+            duplicate_of = self.find_near_duplicate(fingerprint, fingerprints)
+            if duplicate_of is not None:
+                self.agent.metrics.inc("crawl_near_duplicates_total")
+                logger.info(f"Skipping {url}: near-duplicate of {duplicate_of}")
+                yield {"url": url, "depth": depth, "status": "duplicate", "duplicate_of": duplicate_of}
+                continue
+            fingerprints.append((url, fingerprint))
+
+            scrape_result.pop("links", None)
+            result = self.agent.process_url(url, scrape_result)
+            yield {"url": url, "depth": depth, "status": "analyzed" if result["success"] else "failed",
+                   "result": result}
@@ -0,0 +1,78 @@
+import json
+import sqlite3
+import threading
+import time
+import zlib
+
+
+class FetchCache:
+
+    def __init__(self, db_path=None, max_entries=5000):
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.stats = {"lookups": 0, "revalidated": 0, "stores": 0}
+        self.db = sqlite3.connect(db_path or ":memory:", check_same_thread=False)
+        if db_path:
+            self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS fetch_cache ("
+            "url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, body BLOB, raw_content BLOB, page_meta TEXT, "
+            "fetched_at REAL)"
+        )
+        self.db.execute("CREATE INDEX IF NOT EXISTS fetch_cache_fetched ON fetch_cache (fetched_at)")
+        self.db.commit()
+
+    def get(self, url):
+        with self.lock:
+            self.stats["lookups"] += 1
+            row = self.db.execute(
+                "SELECT etag, last_modified, body, raw_content, page_meta FROM fetch_cache WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "etag": row[0],
+            "last_modified": row[1],
+            "html": zlib.decompress(row[2]).decode("utf-8"),
+            "raw_content": zlib.decompress(row[3]).decode("utf-8"),
+            "page_meta": json.loads(row[4]) if row[4] else None,
+        }
+
+    def conditional_headers(self, entry):
+        headers = {}
+        if entry and entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry and entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def mark_revalidated(self, url):
+        with self.lock:
+            self.stats["revalidated"] += 1
+            self.db.execute("UPDATE fetch_cache SET fetched_at = ? WHERE url = ?", (time.time(), url))
+            self.db.commit()
+
+    def set(self, url, etag, last_modified, html, raw_content, page_meta=None):
+        if not etag and not last_modified:
+            return
+        with self.lock:
+            self.stats["stores"] += 1
+            self.db.execute(
+                "INSERT OR REPLACE INTO fetch_cache "
+                "(url, etag, last_modified, body, raw_content, page_meta, fetched_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, etag, last_modified, zlib.compress(html.encode("utf-8")),
+                 zlib.compress((raw_content or "").encode("utf-8")),
+                 json.dumps(page_meta) if page_meta is not None else None, time.time())
+            )
+            self.db.execute(
+                "DELETE FROM fetch_cache WHERE url IN ("
+                "SELECT url FROM fetch_cache ORDER BY fetched_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+            self.db.commit()
+
+    def get_stats(self):
+        with self.lock:
+            stats = dict(self.stats)
+            stats["entries"] = self.db.execute("SELECT COUNT(*) FROM fetch_cache").fetchone()[0]
+        return stats
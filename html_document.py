@@ -0,0 +1,62 @@
+import re
+from urllib.parse import urljoin
+from lxml import etree
+from lxml import html as lxml_html
+from lxml.etree import ParserError
+
+HTML_PARSER = lxml_html.HTMLParser(collect_ids=False, encoding="utf-8", remove_comments=True, remove_pis=True)
+
+
+def parse_html(html):
+    if not html:
+        return None
+    if isinstance(html, str):
+        html = html.encode("utf-8", errors="replace")
+    try:
+        return lxml_html.document_fromstring(html, parser=HTML_PARSER)
+    except (ParserError, ValueError):
+        return None
+
+
+def page_metadata(tree):
+    if tree is None:
+        return {"title": "", "h1": "", "keywords": []}
+
+    title = ""
+    title_el = tree.find(".//title")
+    if title_el is not None:
+        title = (title_el.text_content() or "").strip()
+
+    h1 = ""
+    h1_el = tree.find(".//h1")
+    if h1_el is not None:
+        h1 = h1_el.text_content().strip()
+
+    keywords = []
+    for meta in tree.iter("meta"):
+        if (meta.get("name") or "").lower() == "keywords" and meta.get("content") is not None:
+            keywords = [k.strip() for k in meta.get("content").split(",")]
+            break
+
+    return {"title": title, "h1": h1, "keywords": keywords}
+
+
+def visible_text(tree):
+    if tree is None:
+        return ""
+    etree.strip_elements(tree, "script", "style", with_tail=False)
+    text = "\n".join(tree.itertext())
+    text = re.sub(r'\n+', '\n', text)
+    return re.sub(r'\s+', ' ', text)
+
+
+def page_links(tree, base_url):
+    if tree is None:
+        return []
+    links = []
+    for href in tree.xpath("//a/@href"):
+        href = href.strip()
+        if not href or href.startswith(("#", "mailto:", "javascript:", "tel:")):
+            continue
+        links.append(urljoin(base_url, href))
+    return links
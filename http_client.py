@@ -0,0 +1,149 @@
+import codecs
+import random
+import re
+import time
+from email.utils import parsedate_to_datetime
+import requests
+from requests.adapters import HTTPAdapter
+
+
+def build_session(pool_connections=10, pool_maxsize=10, headers=None):
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=0)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    if headers:
+        session.headers.update(headers)
+    return session
+
+
+def parse_retry_after(value):
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at is None:
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+def backoff_delay(attempt, base=1.0, cap=30.0, retry_after=None):
+    delay = random.uniform(0, min(cap, base * (2 ** attempt)))
+    if retry_after is not None:
+        delay = min(cap, retry_after) + random.uniform(0, base)
+    return delay
+
+
+def connection_stats(session):
+    stats = {"requests": 0, "connections_opened": 0, "connections_reused": 0, "pools": 0}
+    seen = set()
+    for adapter in session.adapters.values():
+        if id(adapter) in seen:
+            continue
+        seen.add(id(adapter))
+        pools = adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            stats["pools"] += 1
+            stats["requests"] += pool.num_requests
+            stats["connections_opened"] += pool.num_connections
+    stats["connections_reused"] = max(0, stats["requests"] - stats["connections_opened"])
+    return stats
+
+
+class FetchAborted(Exception):
+    pass
+
+
+HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml", "text/plain", "application/xml", "text/xml")
+META_CHARSET = re.compile(rb'<meta[^>]+charset\s*=\s*["\']?\s*([A-Za-z0-9_.:-]+)', re.IGNORECASE)
+
+
+def content_type_and_charset(header):
+    parts = [part.strip() for part in (header or "").split(";")]
+    content_type = parts[0].lower()
+    charset = None
+    for part in parts[1:]:
+        if part.lower().startswith("charset="):
+            charset = part.split("=", 1)[1].strip("\"' ")
+    return content_type, charset
+
+
+def known_encoding(name):
+    if not name:
+        return None
+    try:
+        return codecs.lookup(name).name
+    except LookupError:
+        return None
+
+
+def looks_binary(head):
+    if head.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return False
+    return b"\x00" in head[:1024]
+
+
+def sniff_encoding(head):
+    if head.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    if head.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return "utf-16"
+    match = META_CHARSET.search(head)
+    if match:
+        encoding = known_encoding(match.group(1).decode("ascii", "ignore"))
+        if encoding:
+            return encoding
+    return "utf-8"
+
+
+def read_html_limited(response, max_bytes, chunk_size=64 * 1024, allowed_types=HTML_CONTENT_TYPES):
+    content_type, charset = content_type_and_charset(response.headers.get("Content-Type"))
+    if content_type and not content_type.startswith(allowed_types):
+        raise FetchAborted(f"Unsupported content type: {content_type}")
+
+    declared_length = response.headers.get("Content-Length")
+    if declared_length and declared_length.isdigit() and int(declared_length) > max_bytes:
+        raise FetchAborted(f"Page is larger than the {max_bytes} byte limit ({declared_length} bytes)")
+
+    encoding = known_encoding(charset)
+    decoder = None
+    head = b""
+    parts = []
+    received = 0
+
+    for chunk in response.iter_content(chunk_size=chunk_size):
+        if not chunk:
+            continue
+        received += len(chunk)
+        if received > max_bytes:
+            raise FetchAborted(f"Page exceeded the {max_bytes} byte limit")
+
+        if decoder is None:
+            head += chunk
+            if looks_binary(head):
+                raise FetchAborted("Response looks like binary content, not HTML")
+            if len(head) < 4096:
+                continue
+            encoding = encoding or sniff_encoding(head)
+            decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+            parts.append(decoder.decode(head))
+            head = b""
+        else:
+            parts.append(decoder.decode(chunk))
+
+    if decoder is None:
+        if looks_binary(head):
+            raise FetchAborted("Response looks like binary content, not HTML")
+        encoding = encoding or sniff_encoding(head)
+        decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+        parts.append(decoder.decode(head))
+    parts.append(decoder.decode(b"", final=True))
+    return "".join(parts), received
@@ -0,0 +1,97 @@
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TASKS = {
+    "facebook/bart-large-cnn": "summarization",
+    "distilbert-base-uncased-finetuned-sst-2-english": "text-classification",
+    "mistralai/Mixtral-8x7B-Instruct-v0.1": "text-generation",
+}
+
+
+class RemoteBackend:
+
+    name = "remote"
+
+    def __init__(self, agent):
+        self.agent = agent
+
+    def query(self, model, payload, max_retries=3, retry_delay=2):
+        return self.agent.request_inference(model, payload, max_retries, retry_delay)
+
+
+class LocalBackend:
+
+    name = "local"
+
+    def __init__(self, tasks=None, num_threads=None, quantize=False, batch_size=8, pipeline_factory=None):
+        self.tasks = dict(DEFAULT_TASKS)
+        if tasks:
+            self.tasks.update(tasks)
+        self.num_threads = num_threads
+        self.quantize = quantize
+        self.batch_size = batch_size
+        self.pipeline_factory = pipeline_factory or self.transformers_pipeline
+        self.pipelines = {}
+        self.model_locks = {}
+        self.lock = threading.Lock()
+
+        if num_threads:
+            try:
+                import torch
+                torch.set_num_threads(num_threads)
+            except ImportError:
+                logger.warning("torch is not installed; num_threads is ignored")
+
+    def transformers_pipeline(self, task, model):
+        from transformers import pipeline
+
+        pipe = pipeline(task, model=model, device=-1)
+        if self.quantize:
+            import torch
+            pipe.model = torch.quantization.quantize_dynamic(pipe.model, {torch.nn.Linear}, dtype=torch.qint8)
+        return pipe
+
+    def load(self, model):
+        with self.lock:
+            if model not in self.pipelines:
+                task = self.tasks.get(model)
+                if task is None:
+                    raise ValueError(f"No local task configured for model {model}")
+                logger.info(f"Loading local {task} pipeline for {model}")
+                self.pipelines[model] = self.pipeline_factory(task, model)
+                self.model_locks[model] = threading.Lock()
+            return self.pipelines[model], self.model_locks[model]
+
+    def warm_up(self, models):
+        for model in models:
+            self.load(model)
+
+    def query(self, model, payload, max_retries=None, retry_delay=None):
+        inputs = payload.get("inputs")
+        parameters = dict(payload.get("parameters") or {})
+        batched = isinstance(inputs, list)
+        items = inputs if batched else [inputs]
+
+        try:
+            pipe, model_lock = self.load(model)
+            task = self.tasks[model]
+            if task == "text-classification":
+                parameters.setdefault("top_k", None)
+            if task == "text-generation" and parameters.get("temperature") is not None:
+                parameters.setdefault("do_sample", parameters["temperature"] > 0)
+            with model_lock:
+                outputs = pipe(items, batch_size=self.batch_size, truncation=True, **parameters)
+        except Exception as e:
+            return {"error": f"Local inference failed: {str(e)}"}
+
+        outputs = list(outputs)
+        if task == "text-classification":
+            outputs = [output if isinstance(output, list) else [output] for output in outputs]
+        elif task in ("summarization", "text-generation"):
+            outputs = [output[0] if isinstance(output, list) and output else output for output in outputs]
+
+        if batched:
+            return outputs
+        return outputs if task == "text-classification" else outputs[:1]
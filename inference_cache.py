@@ -0,0 +1,141 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+class InferenceCache:
+
+    def __init__(self, max_entries=1024, ttl=7 * 24 * 3600, db_path=None, max_disk_bytes=256 * 1024 * 1024,
+                 evict_every=100):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_disk_bytes = max_disk_bytes
+        self.evict_every = evict_every
+        self.memory = OrderedDict()
+        self.lock = threading.Lock()
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0,
+                      "memory_evictions": 0, "disk_evictions": 0}
+        self.stores_since_evict = 0
+        self.db = None
+        if db_path:
+            self.db = sqlite3.connect(db_path, check_same_thread=False)
+            self.db.execute("PRAGMA journal_mode=WAL")
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS inference_cache ("
+                "key TEXT PRIMARY KEY, model TEXT, response TEXT, size INTEGER, "
+                "expires_at REAL, accessed_at REAL)"
+            )
+            self.db.execute("CREATE INDEX IF NOT EXISTS inference_cache_accessed ON inference_cache (accessed_at)")
+            self.db.commit()
+
+    @staticmethod
+    def make_key(model, payload):
+        canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+        return hashlib.sha256(f"{model}\n{canonical}".encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def is_cacheable(response):
+        if response is None:
+            return False
+        if isinstance(response, dict) and "error" in response:
+            return False
+        return True
+
+    def get(self, model, payload):
+        key = self.make_key(model, payload)
+        now = time.time()
+
+        with self.lock:
+            entry = self.memory.get(key)
+            if entry is not None:
+                expires_at, serialized = entry
+                if expires_at > now:
+                    self.memory.move_to_end(key)
+                    self.stats["memory_hits"] += 1
+                    return json.loads(serialized)
+                del self.memory[key]
+
+            if self.db is not None:
+                row = self.db.execute(
+                    "SELECT response, expires_at FROM inference_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None and row[1] > now:
+                    self.db.execute("UPDATE inference_cache SET accessed_at = ? WHERE key = ?", (now, key))
+                    self.db.commit()
+                    self.remember(key, row[1], row[0])
+                    self.stats["disk_hits"] += 1
+                    return json.loads(row[0])
+
+            self.stats["misses"] += 1
+            return None
+
+    def set(self, model, payload, response):
+        if not self.is_cacheable(response):
+            return
+        key = self.make_key(model, payload)
+        serialized = json.dumps(response, ensure_ascii=False)
+        now = time.time()
+        expires_at = now + self.ttl
+
+        with self.lock:
+            self.remember(key, expires_at, serialized)
+            self.stats["stores"] += 1
+            if self.db is not None:
+                self.db.execute(
+                    "INSERT OR REPLACE INTO inference_cache (key, model, response, size, expires_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, model, serialized, len(serialized), expires_at, now)
+                )
+                self.db.commit()
+                self.stores_since_evict += 1
+                if self.stores_since_evict >= self.evict_every:
+                    self.evict_disk(now)
+
+    def remember(self, key, expires_at, serialized):
+        self.memory[key] = (expires_at, serialized)
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.max_entries:
+            self.memory.popitem(last=False)
+            self.stats["memory_evictions"] += 1
+
+    def evict_disk(self, now=None):
+        now = now or time.time()
+        self.stores_since_evict = 0
+        evicted = self.db.execute("DELETE FROM inference_cache WHERE expires_at <= ?", (now,)).rowcount
+        total = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM inference_cache").fetchone()[0]
+        if total > self.max_disk_bytes:
+            excess = total - self.max_disk_bytes
+            freed = 0
+            stale_keys = []
+            for key, size in self.db.execute("SELECT key, size FROM inference_cache ORDER BY accessed_at"):
+                stale_keys.append((key,))
+                freed += size
+                if freed >= excess:
+                    break
+            self.db.executemany("DELETE FROM inference_cache WHERE key = ?", stale_keys)
+            evicted += len(stale_keys)
+        self.db.commit()
+        self.stats["disk_evictions"] += evicted
+
+    def get_stats(self):
+        with self.lock:
+            stats = dict(self.stats)
+            stats["memory_entries"] = len(self.memory)
+            if self.db is not None:
+                stats["disk_entries"], stats["disk_bytes"] = self.db.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM inference_cache"
+                ).fetchone()
+        hits = stats["memory_hits"] + stats["disk_hits"]
+        lookups = hits + stats["misses"]
+        stats["hit_rate"] = round(hits / lookups, 4) if lookups else 0.0
+        return stats
+
+    def clear(self):
+        with self.lock:
+            self.memory.clear()
+            if self.db is not None:
+                self.db.execute("DELETE FROM inference_cache")
+                self.db.commit()
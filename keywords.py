@@ -0,0 +1,123 @@
+import hashlib
+import json
+import math
+import os
+import re
+import threading
+from collections import Counter
+
+STOP_WORDS = frozenset("""
+a about above after again against all also am an and any are aren't as at be because been before being below
+between both but by can could did do does doing down during each else ever every few for from further get gets
+got had has have having he her here hers herself him himself his how however i if in into is it its itself just
+like made make many may me might more most much must my myself new no nor not now of off on once one only or
+other our ours ourselves out over own per said same say says she should since so some still such than that the
+their theirs them themselves then there these they this those though through to too under until up upon us use
+used using very was we well were what when where whether which while who whom whose why will with within without
+would yet you your yours yourself yourselves among around
+""".split())
+
+WORD = re.compile(r"[a-z0-9][a-z0-9'-]*")
+
+
+class KeywordExtractor:
+
+    def __init__(self, index_path=None, max_keywords=10, save_every=20):
+        self.index_path = index_path
+        self.max_keywords = max_keywords
+        self.save_every = save_every
+        self.doc_freq = Counter()
+        self.num_docs = 0
+        self.seen = set()
+        self.unsaved = 0
+        self.lock = threading.Lock()
+        if index_path and os.path.exists(index_path):
+            with open(index_path, encoding="utf-8") as f:
+                data = json.load(f)
+            self.doc_freq.update(data.get("doc_freq", {}))
+            self.num_docs = data.get("num_docs", 0)
+            self.seen.update(data.get("seen", []))
+
+    def candidates(self, text):
+        words = WORD.findall(text.lower())
+        terms = []
+        previous = None
+        for word in words:
+            if word in STOP_WORDS or word.isdigit() or not 3 <= len(word) <= 25:
+                previous = None
+                continue
+            terms.append(word)
+            if previous:
+                terms.append(f"{previous} {word}")
+            previous = word
+        return terms, len(words)
+
+    def idf(self, term, num_docs):
+        return math.log((1 + num_docs) / (1 + self.doc_freq.get(term, 0))) + 1
+
+    def document_key(self, text):
+        return hashlib.sha256(" ".join(text.split()).encode("utf-8")).hexdigest()[:16]
+
+    def extract(self, text, update_index=True):
+        terms, word_count = self.candidates(text)
+        term_freq = Counter(terms)
+        if not term_freq:
+            return [], 0.0
+
+        with self.lock:
+            num_docs = self.num_docs
+            scores = {term: (1 + math.log(count)) * self.idf(term, num_docs) * (1.2 if " " in term else 1.0)
+                      for term, count in term_freq.items() if " " not in term or count > 1}
+            if update_index:
+                key = self.document_key(text)
+                if key not in self.seen:
+                    self.seen.add(key)
+                    self.observe(term_freq)
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        keywords = []
+        chosen_words = set()
+        for term, _ in ranked:
+            term_words = set(term.split())
+            if term_words & chosen_words:
+                continue
+            keywords.append(term)
+            chosen_words |= term_words
+            if len(keywords) >= self.max_keywords:
+                break
+
+        return keywords, self.confidence(ranked, word_count, num_docs)
+
+    def confidence(self, ranked, word_count, num_docs):
+        if len(ranked) < 5:
+            return 0.0
+        length_factor = min(1.0, word_count / 100)
+        index_factor = 0.6 + 0.4 * min(1.0, num_docs / 50)
+        top = [score for _, score in ranked[:self.max_keywords]]
+        rest = [score for _, score in ranked[self.max_keywords:]] or [0.0]
+        separation = 1 - (sum(rest) / len(rest)) / (sum(top) / len(top))
+        return round(length_factor * index_factor * (0.5 + 0.5 * separation), 3)
+
+    def observe(self, term_freq):
+        self.doc_freq.update(term_freq.keys())
+        self.num_docs += 1
+        self.unsaved += 1
+        if self.index_path and self.unsaved >= self.save_every:
+            self.save_locked()
+
+    def save(self):
+        with self.lock:
+            self.save_locked()
+
+    def save_locked(self):
+        if not self.index_path:
+            return
+        temp_path = f"{self.index_path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({"num_docs": self.num_docs, "doc_freq": self.doc_freq, "seen": sorted(self.seen)}, f)
+        os.replace(temp_path, self.index_path)
+        self.unsaved = 0
+
+    def get_stats(self):
+        with self.lock:
+            return {"documents": self.num_docs, "terms": len(self.doc_freq)}
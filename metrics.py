@@ -0,0 +1,146 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+class Histogram:
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def percentile(self, q):
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            if not bucket_count:
+                continue
+            if seen + bucket_count >= rank:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.buckets[-1] * 2
+                return lower + (upper - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return self.buckets[-1]
+
+
+class Metrics:
+
+    def __init__(self, namespace="scraper", buckets=DEFAULT_BUCKETS):
+        self.namespace = namespace
+        self.buckets = buckets
+        self.counters = {}
+        self.gauges = {}
+        self.histograms = {}
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def key(name, labels):
+        return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+    def inc(self, name, value=1, **labels):
+        key = self.key(name, labels)
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def set_gauge(self, name, value, **labels):
+        with self.lock:
+            self.gauges[self.key(name, labels)] = value
+
+    def observe(self, name, value, **labels):
+        key = self.key(name, labels)
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram(self.buckets)
+            histogram.observe(value)
+
+    @contextmanager
+    def timer(self, stage):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe("stage_latency_seconds", time.perf_counter() - started, stage=stage)
+
+    def percentile(self, name, q, **labels):
+        with self.lock:
+            histogram = self.histograms.get(self.key(name, labels))
+            return histogram.percentile(q) if histogram else None
+
+    def counter_value(self, name, **labels):
+        with self.lock:
+            return self.counters.get(self.key(name, labels), 0)
+
+    @staticmethod
+    def label_text(labels):
+        return ",".join(f"{k}={v}" for k, v in labels)
+
+    def snapshot(self):
+        with self.lock:
+            counters = {}
+            for (name, labels), value in sorted(self.counters.items()):
+                counters.setdefault(name, {})[self.label_text(labels) or "total"] = value
+            latency = {}
+            for (name, labels), histogram in sorted(self.histograms.items()):
+                latency.setdefault(name, {})[self.label_text(labels) or "all"] = {
+                    "count": histogram.count,
+                    "mean": round(histogram.sum / histogram.count, 4) if histogram.count else None,
+                    "p50": self.rounded(histogram.percentile(0.5)),
+                    "p95": self.rounded(histogram.percentile(0.95)),
+                    "p99": self.rounded(histogram.percentile(0.99)),
+                }
+        return {"counters": counters, "latency": latency}
+
+    @staticmethod
+    def rounded(value):
+        return round(value, 4) if value is not None else None
+
+    @staticmethod
+    def prometheus_labels(labels, extra=()):
+        items = list(labels) + list(extra)
+        if not items:
+            return ""
+        escaped = []
+        for k, v in items:
+            value = str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+            escaped.append(f'{k}="{value}"')
+        return "{" + ",".join(escaped) + "}"
+
+    def render_prometheus(self):
+        lines = []
+        with self.lock:
+            for kind, series in (("counter", self.counters), ("gauge", self.gauges)):
+                declared = set()
+                for (name, labels), value in sorted(series.items()):
+                    full_name = f"{self.namespace}_{name}"
+                    if full_name not in declared:
+                        lines.append(f"# TYPE {full_name} {kind}")
+                        declared.add(full_name)
+                    lines.append(f"{full_name}{self.prometheus_labels(labels)} {value}")
+
+            declared = set()
+            for (name, labels), histogram in sorted(self.histograms.items()):
+                full_name = f"{self.namespace}_{name}"
+                if full_name not in declared:
+                    lines.append(f"# TYPE {full_name} histogram")
+                    declared.add(full_name)
+                cumulative = 0
+                for bucket, bucket_count in zip(histogram.buckets, histogram.counts):
+                    cumulative += bucket_count
+                    lines.append(f"{full_name}_bucket{self.prometheus_labels(labels, [('le', bucket)])} {cumulative}")
+                lines.append(f"{full_name}_bucket{self.prometheus_labels(labels, [('le', '+Inf')])} {histogram.count}")
+                lines.append(f"{full_name}_sum{self.prometheus_labels(labels)} {histogram.sum}")
+                lines.append(f"{full_name}_count{self.prometheus_labels(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,124 @@
+import threading
+import time
+
+
+class AdaptiveRateLimiter:
+
+    def __init__(self, rate=4.0, burst=8, concurrency=4, min_rate=0.2, max_rate=50.0, min_concurrency=1,
+                 max_concurrency=32, increase=0.5, decrease=0.5, latency_target=None, cooldown=1.0):
+        self.rate = float(rate)
+        self.burst = burst
+        self.concurrency = float(concurrency)
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_target = latency_target
+        self.cooldown = cooldown
+        self.tokens = float(burst)
+        self.last_refill = time.monotonic()
+        self.last_decrease = 0.0
+        self.in_flight = 0
+        self.waiting = 0
+        self.stats = {"acquired": 0, "throttled": 0, "decreases": 0, "timeouts": 0}
+        self.cond = threading.Condition()
+
+    def refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.last_refill) * self.rate)
+        self.last_refill = now
+
+    def acquire(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self.cond:
+            self.waiting += 1
+            throttled = False
+            try:
+                while True:
+                    now = time.monotonic()
+                    self.refill(now)
+                    if self.tokens >= 1 and self.in_flight < int(self.concurrency):
+                        self.tokens -= 1
+                        self.in_flight += 1
+                        self.stats["acquired"] += 1
+                        if throttled:
+                            self.stats["throttled"] += 1
+                        return True
+                    throttled = True
+                    wait = (1 - self.tokens) / self.rate if self.tokens < 1 else None
+                    if deadline is not None:
+                        remaining = deadline - now
+                        if remaining <= 0:
+                            self.stats["timeouts"] += 1
+                            return False
+                        wait = remaining if wait is None else min(wait, remaining)
+                    self.cond.wait(wait)
+            finally:
+                self.waiting -= 1
+
+    def release(self, status=None, latency=None):
+        with self.cond:
+            self.in_flight = max(0, self.in_flight - 1)
+            now = time.monotonic()
+            if status == 429:
+                self.back_off(now)
+            elif status is not None and status < 500:
+                slow = self.latency_target is not None and latency is not None and latency > self.latency_target
+                if slow:
+                    self.concurrency = max(self.min_concurrency, self.concurrency * 0.9)
+                else:
+                    self.rate = min(self.max_rate, self.rate + self.increase / max(1.0, self.rate))
+                    self.concurrency = min(self.max_concurrency, self.concurrency + 1 / max(1.0, self.concurrency))
+            self.cond.notify_all()
+
+    def back_off(self, now):
+        if now - self.last_decrease < self.cooldown:
+            return
+        self.last_decrease = now
+        self.stats["decreases"] += 1
+        self.rate = max(self.min_rate, self.rate * self.decrease)
+        self.concurrency = max(self.min_concurrency, self.concurrency * self.decrease)
+        self.tokens = min(self.tokens, 0.0)
+
+    def get_stats(self):
+        with self.cond:
+            stats = dict(self.stats)
+            stats.update({
+                "rate_per_s": round(self.rate, 3),
+                "concurrency_limit": int(self.concurrency),
+                "in_flight": self.in_flight,
+                "queue_depth": self.waiting,
+            })
+        return stats
+
+
+class RateLimiterRegistry:
+
+    def __init__(self, **defaults):
+        self.defaults = defaults
+        self.overrides = {}
+        self.limiters = {}
+        self.lock = threading.Lock()
+
+    def configure(self, model, **options):
+        with self.lock:
+            self.overrides[model] = options
+            self.limiters.pop(model, None)
+
+    def get(self, model):
+        with self.lock:
+            limiter = self.limiters.get(model)
+            if limiter is None:
+                options = dict(self.defaults)
+                options.update(self.overrides.get(model, {}))
+                limiter = self.limiters[model] = AdaptiveRateLimiter(**options)
+            return limiter
+
+    def get_stats(self):
+        with self.lock:
+            limiters = dict(self.limiters)
+        return {model: limiter.get_stats() for model, limiter in limiters.items()}
+
+
+RATE_LIMITERS = RateLimiterRegistry()
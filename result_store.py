@@ -0,0 +1,161 @@
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+import zlib
+
+
+def content_hash(text):
+    normalized = " ".join((text or "").split())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+class ResultStore:
+
+    def __init__(self, db_path=None, max_entries=10000):
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.stats = {"lookups": 0, "hits": 0, "hash_hits": 0, "stores": 0, "searches": 0}
+        self.db = sqlite3.connect(db_path or ":memory:", check_same_thread=False)
+        if db_path:
+            self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "id INTEGER PRIMARY KEY, url TEXT UNIQUE, content_hash TEXT, title TEXT, keywords TEXT, summary TEXT, "
+            "sentiment TEXT, raw_content BLOB, html BLOB, analyzed_at REAL)"
+        )
+        self.db.execute("CREATE INDEX IF NOT EXISTS results_hash ON results (content_hash)")
+        self.db.execute("CREATE INDEX IF NOT EXISTS results_analyzed ON results (analyzed_at)")
+        self.fts = self.create_fts_index()
+        self.db.commit()
+
+    def create_fts_index(self):
+        try:
+            self.db.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS results_fts USING fts5("
+                "title, keywords, summary, content='results', content_rowid='id')"
+            )
+        except sqlite3.OperationalError:
+            return False
+        self.db.executescript("""
+            CREATE TRIGGER IF NOT EXISTS results_ai AFTER INSERT ON results BEGIN
+                INSERT INTO results_fts (rowid, title, keywords, summary)
+                VALUES (new.id, new.title, new.keywords, new.summary);
+            END;
+            CREATE TRIGGER IF NOT EXISTS results_ad AFTER DELETE ON results BEGIN
+                INSERT INTO results_fts (results_fts, rowid, title, keywords, summary)
+                VALUES ('delete', old.id, old.title, old.keywords, old.summary);
+            END;
+            CREATE TRIGGER IF NOT EXISTS results_au AFTER UPDATE ON results BEGIN
+                INSERT INTO results_fts (results_fts, rowid, title, keywords, summary)
+                VALUES ('delete', old.id, old.title, old.keywords, old.summary);
+                INSERT INTO results_fts (rowid, title, keywords, summary)
+                VALUES (new.id, new.title, new.keywords, new.summary);
+            END;
+        """)
+        return True
+
+    def row_result(self, row, include_html=False):
+        result = {
+            "success": True,
+            "title": row[0],
+            "keywords": json.loads(row[1]) if row[1] else [],
+            "summary": row[2],
+            "sentiment": row[3],
+            "raw_content": zlib.decompress(row[4]).decode("utf-8"),
+            "analyzed_at": row[6],
+        }
+        if include_html:
+            result["html"] = zlib.decompress(row[5]).decode("utf-8") if row[5] else ""
+        return result
+
+    def lookup(self, column, value, max_age, include_html):
+        min_time = time.time() - max_age if max_age else 0
+        with self.lock:
+            self.stats["lookups"] += 1
+            row = self.db.execute(
+                "SELECT title, keywords, summary, sentiment, raw_content, html, analyzed_at FROM results "
+                f"WHERE {column} = ? AND analyzed_at >= ? ORDER BY analyzed_at DESC LIMIT 1",
+                (value, min_time)
+            ).fetchone()
+        return self.row_result(row, include_html) if row else None
+
+    def get(self, url, max_age=None, include_html=False):
+        result = self.lookup("url", url, max_age, include_html)
+        if result is not None:
+            with self.lock:
+                self.stats["hits"] += 1
+        return result
+
+    def find_by_hash(self, digest, max_age=None):
+        result = self.lookup("content_hash", digest, max_age, False)
+        if result is not None:
+            with self.lock:
+                self.stats["hash_hits"] += 1
+        return result
+
+    def save(self, url, result, html=None, compressed_html=None):
+        if not result.get("success") or result.get("degraded"):
+            return
+        raw_content = result.get("raw_content") or ""
+        if compressed_html is None and html:
+            compressed_html = zlib.compress(html.encode("utf-8"))
+        with self.lock:
+            self.stats["stores"] += 1
+            self.db.execute(
+                "INSERT INTO results "
+                "(url, content_hash, title, keywords, summary, sentiment, raw_content, html, analyzed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (url) DO UPDATE SET content_hash = excluded.content_hash, title = excluded.title, "
+                "keywords = excluded.keywords, summary = excluded.summary, sentiment = excluded.sentiment, "
+                "raw_content = excluded.raw_content, html = excluded.html, analyzed_at = excluded.analyzed_at",
+                (url, content_hash(raw_content), result.get("title"), json.dumps(result.get("keywords") or []),
+                 result.get("summary"), result.get("sentiment"), zlib.compress(raw_content.encode("utf-8")),
+                 compressed_html, result.get("analyzed_at") or time.time())
+            )
+            self.db.execute(
+                "DELETE FROM results WHERE id IN ("
+                "SELECT id FROM results ORDER BY analyzed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+            self.db.commit()
+
+    def search(self, query, limit=20, max_age=None):
+        terms = re.findall(r"\w+", query.lower())
+        if not terms:
+            return []
+        min_time = time.time() - max_age if max_age else 0
+        with self.lock:
+            self.stats["searches"] += 1
+            if self.fts:
+                match = " ".join('"' + term + '"' for term in terms)
+                rows = self.db.execute(
+                    "SELECT r.url, r.title, r.keywords, r.summary, r.sentiment, r.analyzed_at "
+                    "FROM results_fts JOIN results r ON r.id = results_fts.rowid "
+                    "WHERE results_fts MATCH ? AND r.analyzed_at >= ? ORDER BY bm25(results_fts) LIMIT ?",
+                    (match, min_time, limit)
+                ).fetchall()
+            else:
+                where = " AND ".join(["(title || ' ' || keywords || ' ' || summary) LIKE ?"] * len(terms))
+                rows = self.db.execute(
+                    "SELECT url, title, keywords, summary, sentiment, analyzed_at FROM results "
+                    f"WHERE {where} AND analyzed_at >= ? ORDER BY analyzed_at DESC LIMIT ?",
+                    [f"%{term}%" for term in terms] + [min_time, limit]
+                ).fetchall()
+        return [{
+            "url": row[0],
+            "title": row[1],
+            "keywords": json.loads(row[2]) if row[2] else [],
+            "summary": row[3],
+            "sentiment": row[4],
+            "analyzed_at": row[5],
+        } for row in rows]
+
+    def get_stats(self):
+        with self.lock:
+            stats = dict(self.stats)
+            stats["entries"] = self.db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+            stats["full_text_index"] = int(self.fts)
+        return stats
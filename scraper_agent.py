@@ -1,89 +1,277 @@
-import requests
-from bs4 import BeautifulSoup
-import trafilatura
+import os
 from requests.exceptions import RequestException
 import re
 import json
 import time
+import queue
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FutureTimeout
+from http_client import build_session, parse_retry_after, backoff_delay, connection_stats, read_html_limited
+from inference_cache import InferenceCache
+from fetch_cache import FetchCache
+from html_document import parse_html, page_metadata, visible_text, page_links
+from inference_backends import RemoteBackend, LocalBackend
+from batching import MicroBatcher
+from chunking import TokenCounter, chunk_by_tokens, rechunk_by_tokens, pack_segments
+from keywords import KeywordExtractor
+from metrics import Metrics
+from crawler import SiteCrawler
+from rate_limiter import RATE_LIMITERS
+from circuit_breaker import CIRCUIT_BREAKERS
+from chunk_store import ChunkStore
+from result_store import content_hash
+from url_utils import normalize_url
+
+logger = logging.getLogger(__name__)
 
 class ScraperAgent:
-    def __init__(self, hf_api_key=None):
+    def __init__(self, hf_api_key=None, concurrent_stages=True, max_workers=3, stage_timeouts=None,
+                 chunk_workers=4, summary_batch_size=4, api_pool_size=10, web_pool_size=10,
+                 api_timeout=(5, 120), fetch_timeout=(5, 15), max_backoff=30,
+                 use_cache=True, cache=None, cache_db_path=None, use_fetch_cache=True, fetch_cache=None,
+                 fetch_cache_db_path=None, backends=None, local_models=None, local_backend_options=None,
+                 micro_batching=True, micro_batch_size=8, micro_batch_window=0.01, batcher=None,
+                 max_page_bytes=5 * 1024 * 1024, summary_token_budget=1000, max_summary_calls=48,
+                 max_reduce_levels=3, use_tokenizer=True, keyword_extractor=None, keyword_index_path=None,
+                 keyword_confidence=0.3, metrics=None, rate_limiters=None, use_rate_limiter=True,
+                 circuit_breakers=None, use_circuit_breaker=True, hedge_percentile=None, min_hedge_samples=20,
+                 hedge_workers=16, hedge_window=200, incremental=True, chunk_store=None, chunk_store_db_path=None):
         self.hf_api_key = os.environ.get("HF_API_KEY")
+        self.metrics = metrics or Metrics()
+        self.rate_limiters = (rate_limiters or RATE_LIMITERS) if use_rate_limiter else None
+        self.circuit_breakers = (circuit_breakers or CIRCUIT_BREAKERS) if use_circuit_breaker else None
+        self.hedge_percentile = hedge_percentile
+        self.min_hedge_samples = min_hedge_samples
+        self.hedge_window = hedge_window
+        self.primary_latencies = {}
+        self.hedge_lock = threading.Lock()
+        self.hedge_executor = None
+        self.fallback_executor = None
+        if hedge_percentile is not None:
+            self.hedge_executor = ThreadPoolExecutor(max_workers=hedge_workers, thread_name_prefix="scraper-hedge")
+            self.fallback_executor = ThreadPoolExecutor(max_workers=hedge_workers,
+                                                        thread_name_prefix="scraper-fallback")
         self.hf_api_url = "https://api-inference.huggingface.co/models/"
         self.summarization_model = "facebook/bart-large-cnn"
         self.sentiment_model = "distilbert-base-uncased-finetuned-sst-2-english"
         self.text_generation_model = "mistralai/Mixtral-8x7B-Instruct-v0.1"
         self.headers = {"Authorization": f"Bearer {hf_api_key}"} if hf_api_key else {}
+        self.concurrent_stages = concurrent_stages
+        self.max_workers = max_workers
+        self.stage_timeouts = {"metadata": 60, "summary": 180, "sentiment": 60}
+        if stage_timeouts:
+            self.stage_timeouts.update(stage_timeouts)
+        self.chunk_workers = chunk_workers
+        self.summary_batch_size = summary_batch_size
+        self.api_timeout = api_timeout
+        self.fetch_timeout = fetch_timeout
+        self.max_backoff = max_backoff
+        self.max_page_bytes = max_page_bytes
+        self.summary_token_budget = summary_token_budget
+        self.max_summary_calls = max_summary_calls
+        self.max_reduce_levels = max_reduce_levels
+        self.token_counter = TokenCounter(self.summarization_model, use_tokenizer=use_tokenizer)
+        self.keyword_extractor = keyword_extractor or KeywordExtractor(
+            index_path=keyword_index_path or os.environ.get("KEYWORD_INDEX_PATH"))
+        self.keyword_confidence = keyword_confidence
+        self.cache = None
+        if use_cache:
+            self.cache = cache or InferenceCache(db_path=cache_db_path or os.environ.get("HF_CACHE_DB"))
+        self.fetch_cache = None
+        if use_fetch_cache:
+            self.fetch_cache = fetch_cache or FetchCache(db_path=fetch_cache_db_path or os.environ.get("FETCH_CACHE_DB"))
+        self.chunk_store = None
+        if incremental:
+            self.chunk_store = chunk_store or ChunkStore(db_path=chunk_store_db_path or os.environ.get("CHUNK_STORE_DB"))
+        self.api_session = build_session(pool_maxsize=api_pool_size, headers=self.headers)
+        self.remote_backend = RemoteBackend(self)
+        self.backends = dict(backends or {})
+        if local_models is None:
+            local_models = [m.strip() for m in os.environ.get("HF_LOCAL_MODELS", "").split(",") if m.strip()]
+        if local_models:
+            local_backend = LocalBackend(**(local_backend_options or {}))
+            for model in local_models:
+                self.backends.setdefault(model, local_backend)
+        self.batched_models = {self.summarization_model, self.sentiment_model}
+        self.batcher = None
+        self.owns_batcher = micro_batching and batcher is None
+        if micro_batching:
+            self.batcher = batcher or MicroBatcher(self.send_batch, max_batch_size=micro_batch_size,
+                                                   max_wait=micro_batch_window)
+        self.web_session = build_session(pool_maxsize=web_pool_size, headers={
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+        })
 
     def query_huggingface_api(self, model, payload, max_retries=3, retry_delay=2):
+        if self.cache is not None:
+            cached = self.cache.get(model, payload)
+            if cached is not None:
+                self.metrics.inc("inference_cache_hits_total", model=model)
+                return cached
+            self.metrics.inc("inference_cache_misses_total", model=model)
+        
+        breaker = self.circuit_breaker_for(model)
+        if breaker is not None and breaker.is_open():
+            self.metrics.inc("circuit_open_rejections_total", model=model)
+            return {"error": f"Circuit open for {model}: recent requests failed"}
+        
+        self.metrics.inc("inference_calls_total", model=model, backend=self.backend_for(model).name)
+        if self.batcher is not None and model in self.batched_models and self.batcher.accepts(payload):
+            response = self.batcher.query(model, payload)
+        else:
+            response = self.backend_for(model).query(model, payload, max_retries=max_retries, retry_delay=retry_delay)
+        
+        if self.cache is not None:
+            self.cache.set(model, payload, response)
+        return response
+
+    def send_batch(self, model, payload):
+        return self.backend_for(model).query(model, payload)
+
+    def backend_for(self, model):
+        return self.backends.get(model, self.remote_backend)
+
+    def circuit_breaker_for(self, model):
+        if self.circuit_breakers is None or self.backend_for(model) is not self.remote_backend:
+            return None
+        return self.circuit_breakers.get(model)
+
+    def request_inference(self, model, payload, max_retries=3, retry_delay=2):
         endpoint = f"{self.hf_api_url}{model}"
+        breaker = self.circuit_breaker_for(model)
         
         for attempt in range(max_retries):
+            if breaker is not None and not breaker.allow():
+                self.metrics.inc("circuit_open_rejections_total", model=model)
+                return {"error": f"Circuit open for {model}: recent requests failed"}
+            if attempt > 0:
+                self.metrics.inc("hf_retries_total", model=model)
+            limiter = self.rate_limiters.get(model) if self.rate_limiters is not None else None
             try:
-                response = requests.post(endpoint, headers=self.headers, json=payload)
+                if limiter is not None:
+                    limiter.acquire()
+                started = time.perf_counter()
+                try:
+                    response = self.api_session.post(endpoint, json=payload, timeout=self.api_timeout)
+                except Exception:
+                    if limiter is not None:
+                        limiter.release()
+                    raise
+                latency = time.perf_counter() - started
+                if limiter is not None:
+                    limiter.release(response.status_code, latency)
+                self.metrics.observe("hf_request_seconds", latency, model=model)
+                self.metrics.inc("hf_requests_total", model=model, status=response.status_code)
+                if breaker is not None:
+                    breaker.record(None if response.status_code == 429 else response.status_code < 500)
                 
                 if response.status_code == 200:
                     return response.json()
                 
                 if response.status_code == 429:
+                    self.metrics.inc("hf_rate_limited_total", model=model)
+                
+                if response.status_code in (429, 503):
                     if attempt < max_retries - 1:
-                        time.sleep(retry_delay * (attempt + 1))
+                        retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                        time.sleep(backoff_delay(attempt, retry_delay, self.max_backoff, retry_after))
                         continue
-                    else:
+                    elif response.status_code == 429:
                         return {"error": "Rate limit exceeded. Try again later."}
                 
                 return {"error": f"API request failed with status code {response.status_code}: {response.text}"}
                 
             except Exception as e:
+                self.metrics.inc("hf_requests_total", model=model, status="exception")
+                if breaker is not None:
+                    breaker.record(False)
                 if attempt < max_retries - 1:
-                    time.sleep(retry_delay)
+                    time.sleep(backoff_delay(attempt, retry_delay, self.max_backoff))
                     continue
                 return {"error": f"API request failed: {str(e)}"}
 
-    def scrape_website(self, url):
+    def get_connection_stats(self):
+        return {
+            "api": connection_stats(self.api_session),
+            "web": connection_stats(self.web_session)
+        }
+
+    def close(self):
+        if self.owns_batcher:
+            self.batcher.close()
+        for executor in (self.hedge_executor, self.fallback_executor):
+            if executor is not None:
+                executor.shutdown(wait=False)
+        self.api_session.close()
+        self.web_session.close()
+
+    def scrape_website(self, url, with_links=False):
         try:
             if not url.startswith(('http://', 'https://')):
                 url = 'https://' + url
 
-            response = requests.get(url, headers={
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-            }, timeout=15)
+            cached = self.fetch_cache.get(url) if self.fetch_cache is not None else None
+            conditional_headers = self.fetch_cache.conditional_headers(cached) if cached else {}
             
-            if response.status_code >= 400:
-                return {"success": False, "error": f"URL returned status code {response.status_code}"}
+            with self.metrics.timer("fetch"), self.web_session.get(url, headers=conditional_headers,
+                                                                   timeout=self.fetch_timeout, stream=True) as response:
+                self.metrics.inc("fetch_responses_total", status=response.status_code)
+                if response.status_code == 304 and cached:
+                    self.metrics.inc("fetch_cache_hits_total")
+                    self.fetch_cache.mark_revalidated(url)
+                    scrape_result = {"success": True, "raw_content": cached["raw_content"], "html": cached["html"],
+                                     "page_meta": cached["page_meta"], "not_modified": True}
+                    if with_links:
+                        scrape_result["links"] = page_links(parse_html(cached["html"]), response.url)
+                    return scrape_result
+                
+                if response.status_code >= 400:
+                    return {"success": False, "error": f"URL returned status code {response.status_code}"}
+                
+                html, received = read_html_limited(response, self.max_page_bytes)
+                self.metrics.inc("bytes_downloaded_total", received)
+                validators = (response.headers.get("ETag"), response.headers.get("Last-Modified"))
+                final_url = response.url
             
-            downloaded = response.text
-            raw_content = trafilatura.extract(downloaded, include_tables=False, include_images=False)
+            import trafilatura
             
-            if not raw_content:
-                soup = BeautifulSoup(response.text, 'html.parser')
-                
-                for script in soup(["script", "style"]):
-                    script.extract()
+            with self.metrics.timer("extract"):
+                tree = parse_html(html)
+                page_meta = page_metadata(tree)
+                links = page_links(tree, final_url) if with_links else None
+                raw_content = None
+                if tree is not None:
+                    raw_content = trafilatura.extract(tree, include_tables=False, include_images=False)
                 
-                raw_content = soup.get_text(separator='\n')
-                raw_content = re.sub(r'\n+', '\n', raw_content)
-                raw_content = re.sub(r'\s+', ' ', raw_content)
+                if not raw_content:
+                    raw_content = visible_text(tree)
             
-            return {"success": True, "raw_content": raw_content, "html": response.text}
+            if self.fetch_cache is not None:
+                self.fetch_cache.set(url, validators[0], validators[1], html, raw_content, page_meta)
+            
+            scrape_result = {"success": True, "raw_content": raw_content, "html": html, "page_meta": page_meta}
+            if with_links:
+                scrape_result["links"] = links
+            return scrape_result
             
         except RequestException as e:
+            self.metrics.inc("fetch_errors_total", reason="request")
             return {"success": False, "error": f"Request error: {str(e)}"}
         except Exception as e:
+            self.metrics.inc("fetch_errors_total", reason=type(e).__name__)
             return {"success": False, "error": str(e)}
 
-    def extract_metadata(self, content, html):
-        soup = BeautifulSoup(html, 'html.parser')
-        title = soup.title.string if soup.title else ""
-        
-        h1 = soup.find('h1')
-        if h1 and h1.text.strip():
-            title = h1.text.strip() if not title else title
+    def extract_metadata(self, content, html, page_meta=None):
+        if page_meta is None:
+            page_meta = page_metadata(parse_html(html))
+        title = page_meta["title"] or page_meta["h1"]
+        meta_keywords = list(page_meta["keywords"])
         
-        meta_keywords = []
-        keywords_tag = soup.find('meta', attrs={'name': 'keywords'})
-        if keywords_tag and 'content' in keywords_tag.attrs:
-            meta_keywords = [k.strip() for k in keywords_tag['content'].split(',')]
+        local_keywords, confidence = self.keyword_extractor.extract(content)
+        if not meta_keywords and confidence >= self.keyword_confidence:
+            meta_keywords = local_keywords
         
         if not meta_keywords or not title:
             truncated_content = content[:1000] if len(content) > 1000 else content
@@ -102,6 +290,7 @@ class ScraperAgent:
                 "title": "
             """
             
+            self.metrics.inc("mixtral_fallbacks_total", stage="metadata")
             response = self.query_huggingface_api(self.text_generation_model, {
                 "inputs": prompt,
                 "parameters": {
@@ -126,131 +315,370 @@ class ScraperAgent:
                         title = data['title']
                     if 'keywords' in data and data['keywords']:
                         meta_keywords = data['keywords']
-                except Exception as e:
-                    if not meta_keywords:
-                        stop_words = {'the', 'a', 'an', 'and','was','were', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'with', 'by', 'about', 'as', 'into', 'like', 'through', 'after', 'over', 'between', 'out', 'against', 'during', 'without', 'before', 'under', 'around', 'among'}
-                        words = re.findall(r'\b\w{3,15}\b', content.lower())
-                        word_counts = {}
-                        for word in words:
-                            if word not in stop_words and word.isalpha():
-                                word_counts[word] = word_counts.get(word, 0) + 1
-                        meta_keywords = [word for word, count in sorted(word_counts.items(), key=lambda x: x[1], reverse=True)[:10]]
+                except Exception:
+                    pass
+            
+            if not meta_keywords:
+                meta_keywords = local_keywords
             
         return {
             "title": title if title else "Untitled Page",
             "keywords": meta_keywords if meta_keywords else ["no keywords extracted"]
         }
 
-    def analyze_sentiment(self, content):
+    def metadata_stage(self, content, html, page_meta=None):
+        return self.extract_metadata(content, html, page_meta), False
+
+    def analyze_sentiment(self, content, incremental=None):
+        return self.sentiment_stage(content, incremental)[0]
+
+    def sentiment_stage(self, content, incremental=None):
         try:
             truncated_content = content[:1000] if len(content) > 1000 else content
+            sentiment_key = content_hash(truncated_content)
+            previous = incremental["previous"] if incremental else None
+            if previous and previous.get("sentiment") and previous.get("sentiment_key") == sentiment_key:
+                incremental["changes"]["sentiment_reused"] = True
+                incremental["sentiment"] = previous["sentiment"]
+                incremental["sentiment_key"] = sentiment_key
+                return previous["sentiment"], False
             
-            response = self.query_huggingface_api(self.sentiment_model, {
-                "inputs": truncated_content
-            })
-            
-            if isinstance(response, dict) and "error" in response:
-                return f"Sentiment analysis failed: {response['error']}"
-            
-            if isinstance(response, list) and len(response) > 0:
-                if isinstance(response[0], dict):
-                    label = response[0].get('label', 'UNKNOWN')
-                    score = response[0].get('score', 0)
-                    return f"{label} (confidence: {score:.2f})"
-                else:
-                    return f"Sentiment: {str(response[0])}"
-            else:
-                prompt = f"""
-                <s>[INST] Analyze the sentiment of the following text. Categorize it as POSITIVE, NEGATIVE, or NEUTRAL.
-                
-                Text:
-                {truncated_content}
-                
-                Only respond with one word: POSITIVE, NEGATIVE, or NEUTRAL. [/INST]</s>
-                """
-                
-                fallback_response = self.query_huggingface_api(self.text_generation_model, {
-                    "inputs": prompt,
-                    "parameters": {
-                        "max_new_tokens": 10,
-                        "temperature": 0.1,
-                        "return_full_text": False
-                    }
-                })
-                
-                if isinstance(fallback_response, list) and len(fallback_response) > 0:
-                    sentiment_text = fallback_response[0].get("generated_text", "").strip()
-                    if "POSITIVE" in sentiment_text:
-                        return "POSITIVE (fallback analysis)"
-                    elif "NEGATIVE" in sentiment_text:
-                        return "NEGATIVE (fallback analysis)"
-                    else:
-                        return "NEUTRAL (fallback analysis)"
-                
-                return "Sentiment analysis produced unexpected results"
+            sentiment, error = self.with_fallback(self.sentiment_model,
+                                                  lambda: self.model_sentiment(truncated_content),
+                                                  lambda: self.fallback_sentiment(truncated_content))
+            if sentiment:
+                if incremental is not None:
+                    incremental["changes"]["sentiment_reused"] = False
+                    incremental["sentiment"] = sentiment
+                    incremental["sentiment_key"] = sentiment_key
+                return sentiment, False
+            if error:
+                return f"Sentiment analysis failed: {error}", True
+            return "Sentiment analysis produced unexpected results", True
             
         except Exception as e:
-            return f"Sentiment analysis failed: {str(e)}"
-
-    def chunk_text(self, text, chunk_size=1000):
-        chunks = []
-        sentences = re.split(r'(?<=[.!?])\s+', text)
-        current_chunk = []
-        current_size = 0
-        
-        for sentence in sentences:
-            sentence_size = len(sentence)
-            if current_size + sentence_size <= chunk_size:
-                current_chunk.append(sentence)
-                current_size += sentence_size
+            return f"Sentiment analysis failed: {str(e)}", True
+
+    def model_sentiment(self, truncated_content):
+        response = self.query_huggingface_api(self.sentiment_model, {
+            "inputs": truncated_content
+        })
+        
+        if isinstance(response, dict) and "error" in response:
+            return None, response["error"]
+        
+        if isinstance(response, list) and response and isinstance(response[0], list):
+            response = sorted(response[0], key=lambda item: item.get('score', 0), reverse=True)
+        
+        if isinstance(response, list) and len(response) > 0:
+            if isinstance(response[0], dict):
+                label = response[0].get('label', 'UNKNOWN')
+                score = response[0].get('score', 0)
+                return f"{label} (confidence: {score:.2f})", None
+            return f"Sentiment: {str(response[0])}", None
+        return None, None
+
+    def fallback_sentiment(self, truncated_content):
+        prompt = f"""
+        <s>[INST] Analyze the sentiment of the following text. Categorize it as POSITIVE, NEGATIVE, or NEUTRAL.
+        
+        Text:
+        {truncated_content}
+        
+        Only respond with one word: POSITIVE, NEGATIVE, or NEUTRAL. [/INST]</s>
+        """
+        
+        self.metrics.inc("mixtral_fallbacks_total", stage="sentiment")
+        fallback_response = self.query_huggingface_api(self.text_generation_model, {
+            "inputs": prompt,
+            "parameters": {
+                "max_new_tokens": 10,
+                "temperature": 0.1,
+                "return_full_text": False
+            }
+        })
+        
+        if isinstance(fallback_response, list) and len(fallback_response) > 0:
+            sentiment_text = fallback_response[0].get("generated_text", "").strip()
+            if "POSITIVE" in sentiment_text:
+                return "POSITIVE (fallback analysis)", None
+            elif "NEGATIVE" in sentiment_text:
+                return "NEGATIVE (fallback analysis)", None
             else:
-                if current_chunk:
-                    chunks.append(' '.join(current_chunk))
-                current_chunk = [sentence]
-                current_size = sentence_size
+                return "NEUTRAL (fallback analysis)", None
+        return None, None
+
+    def hedge_delay(self, model, expected_calls=1):
+        with self.hedge_lock:
+            latencies = sorted(self.primary_latencies.get(model, ()))
+        if len(latencies) < self.min_hedge_samples:
+            return None
+        latency = latencies[min(len(latencies) - 1, int(self.hedge_percentile * len(latencies)))]
+        return latency * max(1, expected_calls)
+
+    def timed_primary(self, model, primary, expected_calls, started):
+        started_at = time.monotonic()
+        started.put(started_at)
+        value, error = primary()
+        if value:
+            elapsed = (time.monotonic() - started_at) / max(1, expected_calls)
+            self.metrics.observe("primary_call_seconds", elapsed, model=model)
+            with self.hedge_lock:
+                window = self.primary_latencies.get(model)
+                if window is None:
+                    window = self.primary_latencies[model] = deque(maxlen=self.hedge_window)
+                window.append(elapsed)
+        return value, error
+
+    def with_fallback(self, model, primary, fallback, expected_calls=1):
+        if self.hedge_executor is None:
+            value, error = primary()
+            if value:
+                return value, error
+            fallback_value, _ = fallback()
+            return (fallback_value, None) if fallback_value else (None, error)
+        
+        started = queue.Queue()
+        delay = self.hedge_delay(model, expected_calls)
+        primary_future = self.hedge_executor.submit(self.timed_primary, model, primary, expected_calls, started)
+        try:
+            if delay is not None:
+                started_at = started.get()
+                delay = max(0.0, started_at + delay - time.monotonic())
+            value, error = primary_future.result(timeout=delay)
+            if value:
+                return value, error
+            fallback_value, _ = fallback()
+            return (fallback_value, None) if fallback_value else (None, error)
+        except FutureTimeout:
+            pass
+        
+        self.metrics.inc("hedged_requests_total", model=model)
+        fallback_future = self.fallback_executor.submit(fallback)
+        error = None
+        for future in as_completed([primary_future, fallback_future]):
+            value, future_error = future.result()
+            if value:
+                if future is fallback_future:
+                    self.metrics.inc("hedge_fallback_wins_total", model=model)
+                return value, None
+            if future is primary_future:
+                error = future_error
+        return None, error
+
+    def chunk_text(self, text, max_tokens=None):
+        return chunk_by_tokens(text, max_tokens or self.summary_token_budget, self.token_counter.count)
+
+    def summary_requests(self, chunk_count):
+        return -(-chunk_count // max(1, self.summary_batch_size))
+
+    def select_chunks(self, chunks, request_limit):
+        if self.summary_requests(len(chunks)) <= request_limit:
+            return chunks
+        limit = request_limit * max(1, self.summary_batch_size)
+        logger.warning(f"Document has {len(chunks)} chunks ({self.summary_requests(len(chunks))} requests); "
+                       f"summarizing {limit} evenly spaced chunks to stay within "
+                       f"max_summary_calls={self.max_summary_calls}")
+        step = len(chunks) / limit
+        return [chunks[int(i * step)] for i in range(limit)]
+
+    def reduce_summaries(self, summaries, calls_left):
+        for _ in range(self.max_reduce_levels):
+            if len(summaries) <= 1:
+                break
+            groups = pack_segments(summaries, self.summary_token_budget, self.token_counter.count)
+            requests = self.summary_requests(len(groups))
+            if len(groups) <= 1 or requests > calls_left:
+                break
+            reduced = self.summarize_chunks(groups)
+            calls_left -= requests
+            if not reduced or len(reduced) >= len(summaries):
+                break
+            summaries = reduced
+        return summaries
+
+    def summarization_parameters(self, chunk):
+        return {
+            "max_length": min(150, len(chunk)//2),
+            "min_length": 30,
+            "do_sample": False
+        }
+
+    def summary_text(self, item):
+        if isinstance(item, list):
+            item = item[0] if item else None
+        if isinstance(item, dict):
+            return item.get('summary_text', '')
+        return ''
+
+    def summarize_chunks(self, chunks, on_summary=None):
+        summaries = self.summarize_chunk_map(chunks, on_summary)
+        return [summaries[index] for index in sorted(summaries)]
+
+    def summarize_chunk_map(self, chunks, on_summary=None):
+        groups = {}
+        for index, chunk in enumerate(chunks):
+            if len(chunk) < 50:
+                continue
+            key = json.dumps(self.summarization_parameters(chunk), sort_keys=True)
+            groups.setdefault(key, []).append((index, chunk))
+        
+        batch_size = max(1, self.summary_batch_size)
+        batches = []
+        for group in groups.values():
+            for start in range(0, len(group), batch_size):
+                batches.append(group[start:start + batch_size])
         
-        if current_chunk:
-            chunks.append(' '.join(current_chunk))
+        if not batches:
+            return {}
         
-        return chunks
+        total = sum(len(batch) for batch in batches)
+        summaries = {}
+        with ThreadPoolExecutor(max_workers=max(1, min(self.chunk_workers, len(batches))),
+                                thread_name_prefix="scraper-chunk") as executor:
+            futures = [executor.submit(self.summarize_batch, batch) for batch in batches]
+            for future in as_completed(futures):
+                batch_summaries = future.result()
+                summaries.update(batch_summaries)
+                if on_summary is not None:
+                    for index in sorted(batch_summaries):
+                        on_summary(index, total, batch_summaries[index])
+        
+        return summaries
 
-    def summarize_content(self, content):
+    def summarize_batch(self, batch):
+        parameters = self.summarization_parameters(batch[0][1])
+        summaries = {}
+        
+        if len(batch) > 1:
+            response = self.query_huggingface_api(self.summarization_model, {
+                "inputs": [chunk for _, chunk in batch],
+                "parameters": parameters
+            })
+            if isinstance(response, list) and len(response) == len(batch):
+                for (index, _), item in zip(batch, response):
+                    text = self.summary_text(item)
+                    if text:
+                        summaries[index] = text
+        
+        for index, chunk in batch:
+            if index in summaries:
+                continue
+            
+            response = self.query_huggingface_api(self.summarization_model, {
+                "inputs": chunk,
+                "parameters": parameters
+            })
+            
+            if isinstance(response, dict) and "error" in response:
+                continue
+            
+            text = self.summary_text(response)
+            if text:
+                summaries[index] = text
+        
+        return summaries
+
+    def summarize_content(self, content, on_chunk_summary=None, incremental=None):
+        return self.summary_stage(content, on_chunk_summary, incremental)[0]
+
+    def summary_stage(self, content, on_chunk_summary=None, incremental=None):
         try:
             if len(content) < 100:
-                return content
+                return content, False
             
-            chunks = self.chunk_text(content)
-            summaries = []
+            map_limit = max(1, self.max_summary_calls * 3 // 4)
+            previous = incremental["previous"] if incremental else None
+            if previous and previous.get("chunks"):
+                chunks = rechunk_by_tokens(content, [chunk["text"] for chunk in previous["chunks"]],
+                                           self.summary_token_budget, self.token_counter.count)
+            else:
+                chunks = self.chunk_text(content)
+            chunks = self.select_chunks(chunks, map_limit)
+            rounds = -(-len(chunks) // max(1, self.summary_batch_size * self.chunk_workers))
             
-            for chunk in chunks:
-                if len(chunk) < 50:
-                    continue
-                    
-                response = self.query_huggingface_api(self.summarization_model, {
-                    "inputs": chunk,
-                    "parameters": {
-                        "max_length": min(150, len(chunk)//2),
-                        "min_length": 30,
-                        "do_sample": False
-                    }
-                })
-                
-                if "error" in response:
-                    continue
+            def primary():
+                summaries, chunk_state = self.summarize_changed_chunks(chunks, on_chunk_summary, previous)
+                return ((summaries, chunk_state) if summaries else None), None
+            
+            value, _ = self.with_fallback(self.summarization_model, primary,
+                                          lambda: (self.fallback_summary(content), None),
+                                          expected_calls=rounds)
+            
+            if not value:
+                return "Content could not be summarized due to API limitations.", True
+            if isinstance(value, str):
+                return value, False
+            summaries, chunk_state = value
+            if incremental is not None:
+                incremental["chunks"] = chunk_state["chunks"]
+                incremental["changes"].update(chunk_state["changes"])
+            
+            summary_key = content_hash("\n".join(summaries))
+            if previous and previous.get("summary") and previous.get("summary_key") == summary_key:
+                incremental["changes"]["summary_reused"] = True
+                incremental["summary"] = previous["summary"]
+                incremental["summary_key"] = summary_key
+                return previous["summary"], False
+            
+            summary = self.combine_summaries(summaries, self.max_summary_calls - self.summary_requests(len(chunks)))
+            if incremental is not None:
+                incremental["changes"]["summary_reused"] = False
+                incremental["summary"] = summary
+                incremental["summary_key"] = summary_key
+            return summary, False
                 
-                if isinstance(response, list) and len(response) > 0:
-                    summary_text = response[0].get('summary_text', '')
-                    if summary_text:
-                        summaries.append(summary_text)
+        except Exception as e:
+            return f"Summarization failed: {str(e)}", True
+
+    def summarize_changed_chunks(self, chunks, on_summary=None, previous=None):
+        known = {chunk["hash"]: chunk["summary"] for chunk in (previous or {}).get("chunks", [])}
+        hashes = [content_hash(chunk) for chunk in chunks]
+        reused = {index: known[digest] for index, digest in enumerate(hashes) if digest in known}
+        changed = [index for index, chunk in enumerate(chunks) if index not in reused and len(chunk) >= 50]
+        total = sum(1 for chunk in chunks if len(chunk) >= 50)
+        
+        summaries = {index: summary for index, summary in reused.items() if summary}
+        if on_summary is not None:
+            for index in sorted(summaries):
+                on_summary(index, total, summaries[index])
+        
+        def on_changed_summary(index, _, summary):
+            on_summary(changed[index], total, summary)
+        
+        changed_summaries = self.summarize_chunk_map([chunks[index] for index in changed],
+                                                     on_changed_summary if on_summary is not None else None)
+        for index, summary in changed_summaries.items():
+            summaries[changed[index]] = summary
+        
+        chunk_state = {
+            "chunks": [
+                {"text": chunk, "hash": hashes[index], "summary": summaries[index]}
+                for index, chunk in enumerate(chunks) if index in summaries
+            ],
+            "changes": {
+                "chunks_total": len(chunks),
+                "chunks_reused": len(reused),
+                "chunks_changed": len(changed),
+                "changed_chunks": changed,
+            },
+        }
+        return [summaries[index] for index in sorted(summaries)], chunk_state
+
+    def combine_summaries(self, summaries, calls_left):
+        summaries = self.reduce_summaries(summaries, calls_left)
+        
+        if len(summaries) > 1:
+            combined_summary = " ".join(summaries)
             
-            if not summaries:
-                truncated_content = content[:2000] if len(content) > 2000 else content
+            if len(combined_summary) > 1000:
                 prompt = f"""
-                <s>[INST] Summarize the following content in about 3-5 sentences:
+                <s>[INST] Create a concise summary (3-5 sentences) from these partial summaries:
                 
-                {truncated_content} [/INST]</s>
+                {combined_summary} [/INST]</s>
                 """
                 
+                self.metrics.inc("mixtral_fallbacks_total", stage="summary_reduce")
                 response = self.query_huggingface_api(self.text_generation_model, {
                     "inputs": prompt,
                     "parameters": {
@@ -263,64 +691,182 @@ class ScraperAgent:
                 
                 if "error" not in response:
                     return response[0]["generated_text"]
-                else:
-                    return "Content could not be summarized due to API limitations."
-            
-            if len(summaries) > 1:
-                combined_summary = " ".join(summaries)
                 
-                if len(combined_summary) > 1000:
-                    prompt = f"""
-                    <s>[INST] Create a concise summary (3-5 sentences) from these partial summaries:
-                    
-                    {combined_summary} [/INST]</s>
-                    """
-                    
-                    response = self.query_huggingface_api(self.text_generation_model, {
-                        "inputs": prompt,
-                        "parameters": {
-                            "max_new_tokens": 300,
-                            "temperature": 0.3,
-                            "top_p": 0.95,
-                            "return_full_text": False
-                        }
-                    })
-                    
-                    if "error" not in response:
-                        return response[0]["generated_text"]
-                    
-                return combined_summary
-            elif len(summaries) == 1:
-                return summaries[0]
-            else:
-                return "Content could not be summarized."
+            return combined_summary
+        elif len(summaries) == 1:
+            return summaries[0]
+        else:
+            return "Content could not be summarized."
+
+    def fallback_summary(self, content):
+        truncated_content = content[:2000] if len(content) > 2000 else content
+        prompt = f"""
+        <s>[INST] Summarize the following content in about 3-5 sentences:
+        
+        {truncated_content} [/INST]</s>
+        """
+        
+        self.metrics.inc("mixtral_fallbacks_total", stage="summary")
+        response = self.query_huggingface_api(self.text_generation_model, {
+            "inputs": prompt,
+            "parameters": {
+                "max_new_tokens": 300,
+                "temperature": 0.3,
+                "top_p": 0.95,
+                "return_full_text": False
+            }
+        })
+        
+        if "error" not in response:
+            return response[0]["generated_text"]
+        return None
+
+    def stage_events(self, raw_content, html_content, page_meta=None, incremental=None):
+        events = queue.Queue()
+        
+        def on_chunk_summary(index, total, summary):
+            events.put(("chunk", {"event": "chunk_summary", "index": index, "total": total, "summary": summary}))
+        
+        stages = {
+            "metadata": (self.timed_stage, ("metadata", self.metadata_stage, raw_content, html_content, page_meta)),
+            "summary": (self.timed_stage, ("summarize", self.summary_stage, raw_content, on_chunk_summary,
+                                           incremental)),
+            "sentiment": (self.timed_stage, ("sentiment", self.sentiment_stage, raw_content, incremental)),
+        }
+        
+        if not self.concurrent_stages:
+            for name, (func, args) in stages.items():
+                try:
+                    value, degraded = func(*args)
+                except Exception as e:
+                    value, degraded = self.stage_fallback(name, str(e)), True
+                while not events.empty():
+                    yield events.get()[1]
+                yield self.stage_event(name, value, degraded)
+            return
+        
+        executor = ThreadPoolExecutor(max_workers=max(1, self.max_workers), thread_name_prefix="scraper-stage")
+        try:
+            started = time.monotonic()
+            deadlines = {name: started + self.stage_timeouts[name] for name in stages}
+            futures = {}
+            for name, (func, args) in stages.items():
+                future = executor.submit(func, *args)
+                future.add_done_callback(lambda f, name=name: events.put(("stage", name)))
+                futures[name] = future
+            
+            pending = set(stages)
+            while pending:
+                timeout = max(0, min(deadlines[name] for name in pending) - time.monotonic())
+                try:
+                    kind, item = events.get(timeout=timeout)
+                except queue.Empty:
+                    now = time.monotonic()
+                    for name in [name for name in pending if deadlines[name] <= now]:
+                        pending.discard(name)
+                        futures[name].cancel()
+                        reason = f"timed out after {self.stage_timeouts[name]}s"
+                        self.metrics.inc("stage_timeouts_total", stage=name)
+                        yield self.stage_event(name, self.stage_fallback(name, reason), True)
+                    continue
                 
-        except Exception as e:
-            return f"Summarization failed: {str(e)}"
+                if kind == "chunk":
+                    if "summary" in pending:
+                        yield item
+                    continue
+                if item not in pending:
+                    continue
+                pending.discard(item)
+                try:
+                    value, degraded = futures[item].result()
+                except Exception as e:
+                    value, degraded = self.stage_fallback(item, str(e)), True
+                yield self.stage_event(item, value, degraded)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def timed_stage(self, stage, func, *args):
+        with self.metrics.timer(stage):
+            return func(*args)
+
+    def stage_event(self, stage, value, degraded=False):
+        if stage == "metadata":
+            return {"event": "metadata", "title": value["title"], "keywords": value["keywords"], "degraded": degraded}
+        return {"event": stage, stage: value, "degraded": degraded}
+
+    def stage_fallback(self, stage, reason):
+        if stage == "metadata":
+            return {"title": "Untitled Page", "keywords": ["no keywords extracted"]}
+        if stage == "summary":
+            return f"Summarization failed: {reason}"
+        return f"Sentiment analysis failed: {reason}"
 
-    def process_url(self, url):
-        scrape_result = self.scrape_website(url)
+    def iter_process_url(self, url, scrape_result=None):
+        if scrape_result is None:
+            scrape_result = self.scrape_website(url)
         
         if not scrape_result["success"]:
-            return {
+            yield {"event": "result", "result": {
                 "success": False,
                 "error": scrape_result["error"]
-            }
+            }}
+            return
         
         raw_content = scrape_result["raw_content"]
-        html_content = scrape_result.get("html", "")
-        
-        metadata = self.extract_metadata(raw_content, html_content)
+        page_meta = scrape_result.get("page_meta")
+        html_content = "" if page_meta is not None else scrape_result.get("html", "")
+        scrape_result = None
         
-        summary = self.summarize_content(raw_content)
+        yield {"event": "content", "raw_content": raw_content}
         
-        sentiment = self.analyze_sentiment(raw_content)
+        incremental = self.load_incremental(url)
+        result = {"success": True, "title": None, "keywords": None, "summary": None, "sentiment": None,
+                  "degraded": []}
+        for event in self.stage_events(raw_content, html_content, page_meta, incremental):
+            if event.get("degraded"):
+                result["degraded"].append(event["event"])
+            if event["event"] == "metadata":
+                result["title"] = event["title"]
+                result["keywords"] = event["keywords"]
+            elif event["event"] in ("summary", "sentiment"):
+                result[event["event"]] = event[event["event"]]
+            yield event
         
-        return {
-            "success": True,
-            "title": metadata["title"],
-            "keywords": metadata["keywords"],
-            "summary": summary,
-            "sentiment": sentiment,
-            "raw_content": raw_content
-        }
+        result["raw_content"] = raw_content
+        if incremental is not None:
+            result["changes"] = dict(incremental["changes"])
+            self.save_incremental(url, incremental)
+        yield {"event": "result", "result": result}
+
+    def load_incremental(self, url):
+        if self.chunk_store is None:
+            return None
+        previous = self.chunk_store.get(normalize_url(url))
+        return {"previous": previous, "changes": {
+            "previous_analyzed_at": previous["analyzed_at"] if previous else None}}
+
+    def save_incremental(self, url, incremental):
+        previous = incremental["previous"] or {}
+        state = {}
+        source = incremental if "chunks" in incremental else previous
+        for key in ("chunks", "summary", "summary_key"):
+            state[key] = source.get(key)
+        source = incremental if "sentiment" in incremental else previous
+        for key in ("sentiment", "sentiment_key"):
+            state[key] = source.get(key)
+        if state["chunks"] or state["sentiment"]:
+            self.chunk_store.set(normalize_url(url), state)
+
+    def process_url(self, url, scrape_result=None):
+        result = None
+        with self.metrics.timer("process_url"):
+            for event in self.iter_process_url(url, scrape_result):
+                if event["event"] == "result":
+                    result = event["result"]
+        self.metrics.inc("urls_processed_total", success=bool(result and result["success"]))
+        return result
+
+    def crawl_site(self, seed_url, max_depth=2, max_pages=20, politeness_delay=1.0, near_duplicate_distance=3):
+        crawler = SiteCrawler(self, max_depth=max_depth, max_pages=max_pages, politeness_delay=politeness_delay,
+                              near_duplicate_distance=near_duplicate_distance)
+        return crawler.crawl(seed_url)
@@ -0,0 +1,226 @@
+import argparse
+import json
+import logging
+import queue
+import signal
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+from agent_manager import AgentManager
+
+logger = logging.getLogger(__name__)
+
+
+class JobQueue:
+
+    def __init__(self, agent_manager, workers=4, max_queued=100, max_finished=1000, finished_ttl=3600):
+        self.agent_manager = agent_manager
+        self.metrics = agent_manager.scraper_agent.metrics
+        self.max_finished = max_finished
+        self.finished_ttl = finished_ttl
+        self.pending = queue.Queue(maxsize=max_queued)
+        self.jobs = OrderedDict()
+        self.lock = threading.Lock()
+        self.running = 0
+        self.draining = False
+        self.workers = [threading.Thread(target=self.work, name=f"service-worker-{i}", daemon=True)
+                        for i in range(max(1, workers))]
+        for worker in self.workers:
+            worker.start()
+
+    def submit(self, url):
+        if self.draining:
+            return None, "draining"
+        job = {"id": uuid.uuid4().hex, "url": url, "status": "queued", "submitted_at": time.time()}
+        with self.lock:
+            self.jobs[job["id"]] = job
+        try:
+            self.pending.put_nowait(job)
+        except queue.Full:
+            with self.lock:
+                self.jobs.pop(job["id"], None)
+            self.metrics.inc("service_jobs_rejected_total", reason="queue_full")
+            return None, "queue_full"
+        self.metrics.inc("service_jobs_submitted_total")
+        return job, None
+
+    def work(self):
+        while True:
+            job = self.pending.get()
+            if job is None:
+                self.pending.task_done()
+                return
+            with self.lock:
+                self.running += 1
+                job["status"] = "running"
+                job["started_at"] = time.time()
+            self.metrics.observe("service_queue_wait_seconds", job["started_at"] - job["submitted_at"])
+            try:
+                result = self.agent_manager.process_website(job["url"])
+            except Exception as e:
+                result = {"success": False, "error": f"Processing failed: {str(e)}"}
+            with self.lock:
+                self.running -= 1
+                job["status"] = "done"
+                job["finished_at"] = time.time()
+                job["result"] = result
+                self.evict_finished()
+            self.metrics.inc("service_jobs_completed_total", success=bool(result.get("success")))
+            self.pending.task_done()
+
+    def evict_finished(self):
+        cutoff = time.time() - self.finished_ttl
+        finished = [job_id for job_id, job in self.jobs.items() if job["status"] == "done"]
+        excess = len(finished) - self.max_finished
+        for job_id in finished:
+            if excess <= 0 and self.jobs[job_id]["finished_at"] >= cutoff:
+                break
+            del self.jobs[job_id]
+            excess -= 1
+
+    def get(self, job_id):
+        with self.lock:
+            job = self.jobs.get(job_id)
+            return dict(job) if job else None
+
+    def drain(self, timeout=None):
+        self.draining = True
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.pending.unfinished_tasks:
+            if deadline is not None and time.monotonic() >= deadline:
+                logger.warning(f"Drain timed out with {self.pending.unfinished_tasks} jobs unfinished")
+                return False
+            time.sleep(0.05)
+        for _ in self.workers:
+            self.pending.put(None)
+        return True
+
+    def get_stats(self):
+        with self.lock:
+            return {
+                "queued": self.pending.qsize(),
+                "capacity": self.pending.maxsize,
+                "running": self.running,
+                "workers": len(self.workers),
+                "tracked_jobs": len(self.jobs),
+                "draining": int(self.draining),
+            }
+
+
+class ServiceHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    jobs = None
+    retry_after = 5
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+    def send_json(self, status, payload, headers=()):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_text(self, status, text):
+        body = text.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        if urlsplit(self.path).path.rstrip("/") != "/jobs":
+            return self.send_json(404, {"error": "Not found"})
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            payload = json.loads(self.rfile.read(length) or b"{}")
+        except (ValueError, json.JSONDecodeError):
+            return self.send_json(400, {"error": "Request body must be JSON"})
+        url = payload.get("url") if isinstance(payload, dict) else None
+        if not isinstance(url, str) or not url.strip():
+            return self.send_json(400, {"error": "Missing 'url'"})
+        is_valid, url_or_error = self.jobs.agent_manager.validate_url(url.strip())
+        if not is_valid:
+            return self.send_json(400, {"error": url_or_error})
+
+        job, rejection = self.jobs.submit(url.strip())
+        if rejection == "queue_full":
+            return self.send_json(429, {"error": "Job queue is full, retry later"},
+                                  headers=[("Retry-After", str(self.retry_after))])
+        if rejection == "draining":
+            return self.send_json(503, {"error": "Service is shutting down"})
+        self.send_json(202, {"job_id": job["id"], "status": job["status"]},
+                       headers=[("Location", f"/jobs/{job['id']}")])
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        path = parts.path.rstrip("/")
+        if path.startswith("/jobs/"):
+            job = self.jobs.get(path[len("/jobs/"):])
+            if job is None:
+                return self.send_json(404, {"error": "Unknown job"})
+            if job.get("result") and parse_qs(parts.query).get("raw_content") == ["0"]:
+                job["result"] = {k: v for k, v in job["result"].items() if k != "raw_content"}
+            return self.send_json(200, job)
+        if path == "/health":
+            status = self.jobs.agent_manager.get_health_status()
+            status["service"] = self.jobs.get_stats()
+            return self.send_json(503 if self.jobs.draining else 200, status)
+        if path == "/metrics":
+            for name, value in self.jobs.get_stats().items():
+                self.jobs.metrics.set_gauge(f"service_{name}", value)
+            return self.send_text(200, self.jobs.agent_manager.get_prometheus_metrics())
+        self.send_json(404, {"error": "Not found"})
+
+
+def build_server(agent_manager, host="127.0.0.1", port=8000, workers=4, max_queued=100, retry_after=5):
+    jobs = JobQueue(agent_manager, workers=workers, max_queued=max_queued)
+    handler = type("BoundServiceHandler", (ServiceHandler,), {"jobs": jobs, "retry_after": retry_after})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server, jobs
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Serve website analysis over HTTP with a bounded job queue.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=4, help="URLs analyzed at once")
+    parser.add_argument("--max-queued", type=int, default=100, help="Queued jobs before submissions get 429")
+    parser.add_argument("--drain-timeout", type=float, default=120.0, help="Seconds to finish queued jobs on shutdown")
+    parser.add_argument("--api-key", default=None, help="Hugging Face API key (defaults to HF_API_KEY)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    agent_manager = AgentManager(hf_api_key=args.api_key)
+    server, jobs = build_server(agent_manager, args.host, args.port, args.workers, args.max_queued)
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+
+    threading.Thread(target=server.serve_forever, name="service-http", daemon=True).start()
+    logger.info(f"Serving on http://{args.host}:{server.server_port} with {args.workers} workers")
+    while not stop.wait(1.0):
+        pass
+
+    logger.info("Shutting down: draining queued jobs")
+    drained = jobs.drain(timeout=args.drain_timeout)
+    server.shutdown()
+    server.server_close()
+    logger.info("Drain complete" if drained else "Stopped with unfinished jobs")
+    return 0 if drained else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())